@@ -0,0 +1,90 @@
+from readelf_clone.elfStructs import IDENT, getStruct
+
+SHT_PROGBITS = 1
+SHT_SYMTAB = 2
+SHT_STRTAB = 3
+PT_LOAD = 1
+PT_PHDR = 6
+TEXT_ADDRESS = 0x400000
+# A plausible e_machine for each (class, data encoding): i386, x86-64, MIPS and PowerPC 64-bit
+MACHINES = {(1, 1): 3, (2, 1): 62, (1, 2): 8, (2, 2): 21}
+
+# Writes a synthetic but well formed ELF file to path with the given class (1 or 2), data encoding (1 little, 2 big),
+# number of section headers (at least 5) and number of .symtab symbols, and returns the size of the file in bytes.
+# Sections past the fixed NULL/.text/.shstrtab/.symtab/.strtab ones are empty PROGBITS sections named .bench.N.
+# Source: https://refspecs.linuxbase.org/elf/gabi4+/
+def generateElf(path, ei_class=2, ei_data=1, sectionCount=64, symbolCount=100000):
+    if sectionCount < 5:
+        raise Exception('A generated file needs at least 5 sections')
+    header = getStruct('Header', ei_class, ei_data)
+    programHeader = getStruct('ProgramHeader', ei_class, ei_data)
+    sectionHeader = getStruct('SectionHeader', ei_class, ei_data)
+    symbol = getStruct('Symbol', ei_class, ei_data)
+    ehsize = IDENT.size + header.size
+
+    names = ['', '.text', '.shstrtab', '.symtab', '.strtab'] + ['.bench.%d' %(index) for index in range(sectionCount - 5)]
+    shstrtab = bytearray()
+    nameOffsets = []
+    for name in names:
+        nameOffsets.append(len(shstrtab))
+        shstrtab += name.encode() + b"\x00"
+
+    # Every symbol is a 16 byte global function laid out back to back from the start of .text. Only the first page
+    # of .text is actually written, the parsers never look at the code the symbols point to.
+    strtab = bytearray(b"\x00")
+    symtab = bytearray(symbol.size * symbolCount)
+    for index in range(symbolCount):
+        nameOffset = len(strtab)
+        strtab += b"bench_function_%d\x00" %(index)
+        value = TEXT_ADDRESS + index * 16
+        if ei_class == 1:
+            symbol.pack_into(symtab, index * symbol.size, nameOffset, value, 16, 0x12, 0, 1)
+        else:
+            symbol.pack_into(symtab, index * symbol.size, nameOffset, 0x12, 0, 1, value, 16)
+    text = b"\xc3" * 4096
+
+    programHeaderCount = 2
+    phoff = ehsize
+    textOffset = phoff + programHeaderCount * programHeader.size
+    shstrtabOffset = textOffset + len(text)
+    symtabOffset = shstrtabOffset + len(shstrtab)
+    symtabOffset += -symtabOffset % 8
+    strtabOffset = symtabOffset + len(symtab)
+    shoff = strtabOffset + len(strtab)
+    shoff += -shoff % 8
+
+    def packProgramHeader(p_type, p_offset, p_vaddr, p_filesz, p_memsz, p_flags, p_align):
+        if ei_class == 1:
+            return programHeader.pack(p_type, p_offset, p_vaddr, p_vaddr, p_filesz, p_memsz, p_flags, p_align)
+        return programHeader.pack(p_type, p_flags, p_offset, p_vaddr, p_vaddr, p_filesz, p_memsz, p_align)
+
+    programHeaders = (
+        packProgramHeader(PT_PHDR, phoff, TEXT_ADDRESS + phoff, programHeaderCount * programHeader.size, programHeaderCount * programHeader.size, 4, 8)
+        + packProgramHeader(PT_LOAD, 0, TEXT_ADDRESS, shstrtabOffset, shstrtabOffset, 5, 0x1000)
+    )
+    sections = [
+        sectionHeader.pack(0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+        sectionHeader.pack(nameOffsets[1], SHT_PROGBITS, 6, TEXT_ADDRESS + textOffset, textOffset, len(text), 0, 0, 16, 0),
+        sectionHeader.pack(nameOffsets[2], SHT_STRTAB, 0, 0, shstrtabOffset, len(shstrtab), 0, 0, 1, 0),
+        sectionHeader.pack(nameOffsets[3], SHT_SYMTAB, 0, 0, symtabOffset, len(symtab), 4, 1, 8, symbol.size),
+        sectionHeader.pack(nameOffsets[4], SHT_STRTAB, 0, 0, strtabOffset, len(strtab), 0, 0, 1, 0),
+    ]
+    for index in range(5, sectionCount):
+        sections.append(sectionHeader.pack(nameOffsets[index], SHT_PROGBITS, 2, 0, textOffset, 0, 0, 0, 1, 0))
+
+    ident = b"\x7fELF" + bytes((ei_class, ei_data, 1)) + bytes(IDENT.size - 7)
+    fileHeader = header.pack(
+        2, MACHINES[(ei_class, ei_data)], 1, TEXT_ADDRESS + textOffset, phoff, shoff, 0, ehsize,
+        programHeader.size, programHeaderCount, sectionHeader.size, sectionCount, 2
+    )
+    with open(path, 'wb') as elfFile:
+        elfFile.write(ident + fileHeader)
+        elfFile.write(programHeaders)
+        elfFile.write(text)
+        elfFile.write(shstrtab)
+        elfFile.write(bytes(symtabOffset - shstrtabOffset - len(shstrtab)))
+        elfFile.write(symtab)
+        elfFile.write(strtab)
+        elfFile.write(bytes(shoff - strtabOffset - len(strtab)))
+        elfFile.write(b''.join(sections))
+        return elfFile.tell()
@@ -0,0 +1,246 @@
+# Benchmarks the parser on generated ELF files. Run from the Project1 directory:
+#    python -m benchmarks.runBenchmarks --output results.json
+#    python -m benchmarks.runBenchmarks --baseline benchmarks/baseline.json --threshold 0.3
+# benchmarks/baseline.json was recorded with the default options.
+# The cache-* stages compare opening a file and decoding its headers without the parse cache, into an empty cache and
+# from a filled one, so the cost or gain of --cache shows next to the stages it replaces.
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from benchmarks.elfGenerator import generateElf
+from readelf_clone.elf import Elf
+from readelf_clone.renderers import createRenderer
+from readelf_clone.parseCache import ParseCache
+
+CLASSES = {'32': 1, '64': 2}
+ENDIANS = {'little': 1, 'big': 2}
+
+class StageTimer():
+    # Times the block it wraps and, when memory is traced, records the peak traced allocation inside it
+    def __init__(self, traceMemory) -> None:
+        self.traceMemory = traceMemory
+        self.elapsed = 0.0
+        self.peak = 0
+
+    def __enter__(self):
+        if self.traceMemory:
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        if self.traceMemory:
+            self.peak = tracemalloc.get_traced_memory()[1] - self.base
+        return False
+
+# Each stage opens the file itself, times only its own work with the timer and returns the records and bytes that work covered
+
+def stageHeader(path, timer):
+    with open(path, 'rb') as elfFile:
+        with timer:
+            elf = Elf(elfFile)
+        size = elf.header.e_ehsize
+        elf.close()
+    return 1, size
+
+def stageProgramHeader(path, timer):
+    with open(path, 'rb') as elfFile:
+        elf = Elf(elfFile)
+        with timer:
+            programHeader = elf.programHeader
+        records = len(programHeader.entries)
+        elf.close()
+    return records, records * elf.header.e_phentsize
+
+def stageSectionHeader(path, timer):
+    with open(path, 'rb') as elfFile:
+        elf = Elf(elfFile)
+        with timer:
+            sectionHeader = elf.sectionHeader
+        records = len(sectionHeader.entries)
+        elf.close()
+    return records, records * elf.header.e_shentsize
+
+def stageSymbolTable(path, timer):
+    with open(path, 'rb') as elfFile:
+        elf = Elf(elfFile)
+        elf.sectionHeader
+        with timer:
+            records = 0
+            for _ in elf.symbolTable.entries:
+                records += 1
+        size = elf.sectionHeader.entries[elf.sectionHeader.indexSYMTAB].sh_size
+        elf.close()
+    return records, size
+
+# Returns a stage that decodes and renders the symbol table in outputFormat into a discarded stream
+def renderStage(outputFormat):
+    def stageRender(path, timer):
+        with open(path, 'rb') as elfFile, open(os.devnull, 'w', buffering=1 << 20, encoding='utf-8', newline='') as output:
+            elf = Elf(elfFile)
+            elf.sectionHeader
+            renderer = createRenderer(outputFormat, output)
+            with timer:
+                renderer.render('symbols', elf.symbolTable)
+                output.flush()
+            records = len(elf.symbolTable.entries)
+            size = elf.sectionHeader.entries[elf.sectionHeader.indexSYMTAB].sh_size
+            elf.close()
+        return records, size
+    return stageRender
+
+# Returns a stage that opens the file and decodes the headers the parse cache holds (ELF, program and section headers),
+# uncached, into an empty cache (cold, including writing what was parsed) or from a cache filled beforehand (warm).
+# Opening the cache and filling it for the warm run are not timed.
+def cacheStage(mode):
+    def stageCache(path, timer):
+        directory = tempfile.mkdtemp()
+        cache = ParseCache(os.path.join(directory, 'cache.sqlite')) if mode != 'uncached' else None
+        try:
+            if mode == 'warm':
+                with open(path, 'rb') as elfFile:
+                    elf = Elf(elfFile, cache)
+                    elf.programHeader
+                    elf.sectionHeader
+                    elf.close()
+                cache.flush()
+            with timer:
+                with open(path, 'rb') as elfFile:
+                    elf = Elf(elfFile, cache)
+                    elf.programHeader
+                    records = len(elf.sectionHeader.entries)
+                    elf.close()
+                if cache is not None:
+                    cache.flush()
+            size = elf.header.e_ehsize + len(elf.programHeader.entries) * elf.header.e_phentsize + records * elf.header.e_shentsize
+        finally:
+            if cache is not None:
+                cache.close()
+            shutil.rmtree(directory)
+        return records, size
+    return stageCache
+
+# The stages in the order they run, with how many extra repeats the very short ones get to steady their timings
+STAGES = (
+    ('header', stageHeader, 100),
+    ('programHeader', stageProgramHeader, 100),
+    ('sectionHeader', stageSectionHeader, 10),
+    ('symbolTable', stageSymbolTable, 1),
+    ('render-text', renderStage('text'), 1),
+    ('render-jsonl', renderStage('jsonl'), 1),
+    ('render-csv', renderStage('csv'), 1),
+    ('cache-uncached', cacheStage('uncached'), 10),
+    ('cache-cold', cacheStage('cold'), 10),
+    ('cache-warm', cacheStage('warm'), 10),
+)
+
+# Runs a stage repeat times keeping the fastest run, then once more with tracemalloc on for its peak memory
+def measureStage(stage, path, repeat):
+    best = None
+    for _ in range(repeat):
+        timer = StageTimer(False)
+        records, size = stage(path, timer)
+        if best is None or timer.elapsed < best:
+            best = timer.elapsed
+    tracemalloc.start()
+    try:
+        timer = StageTimer(True)
+        stage(path, timer)
+    finally:
+        tracemalloc.stop()
+    best = max(best, 1e-9)
+    return {
+        'seconds': best,
+        'records': records,
+        'bytes': size,
+        'recordsPerSecond': records / best,
+        'megabytesPerSecond': size / best / 1e6,
+        'peakMemoryMB': timer.peak / 1e6,
+    }
+
+# Generates one file per class and byte order combination and measures every stage on it
+def runBenchmarks(classes, endians, sectionCount, symbolCount, repeat, directory, log=sys.stderr):
+    results = {}
+    for className in classes:
+        for endianName in endians:
+            case = 'elf%s-%s' %(className, endianName)
+            path = os.path.join(directory, case + '.elf')
+            fileSize = generateElf(path, CLASSES[className], ENDIANS[endianName], sectionCount, symbolCount)
+            results[case] = {'fileBytes': fileSize, 'stages': {}}
+            for name, stage, extra in STAGES:
+                results[case]['stages'][name] = measureStage(stage, path, repeat * extra)
+                measured = results[case]['stages'][name]
+                log.write('%-14s %-14s %12.0f records/s %9.1f MB/s %8.2f MB peak\n' %(
+                    case, name, measured['recordsPerSecond'], measured['megabytesPerSecond'], measured['peakMemoryMB']))
+    return results
+
+# Returns a description of every stage whose throughput fell more than threshold (a fraction) below the baseline
+def findRegressions(results, baseline, threshold):
+    regressions = []
+    for case, measured in results.items():
+        expected = baseline.get('results', {}).get(case)
+        if expected is None:
+            continue
+        for name, stage in measured['stages'].items():
+            if name not in expected['stages']:
+                continue
+            ratio = stage['recordsPerSecond'] / expected['stages'][name]['recordsPerSecond']
+            if ratio < 1 - threshold:
+                regressions.append('%s %s: %.0f records/s is %.0f%% of the baseline %.0f records/s' %(
+                    case, name, stage['recordsPerSecond'], ratio * 100, expected['stages'][name]['recordsPerSecond']))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks every parsing and rendering stage on generated ELF files')
+    parser.add_argument('--classes', nargs='+', choices=sorted(CLASSES), default=sorted(CLASSES))
+    parser.add_argument('--endians', nargs='+', choices=sorted(ENDIANS), default=sorted(ENDIANS))
+    parser.add_argument('--sections', help='Number of section headers in each generated file', type=int, default=64)
+    parser.add_argument('--symbols', help='Number of .symtab symbols in each generated file', type=int, default=100000)
+    parser.add_argument('--repeat', help='Runs per stage, the fastest is kept', type=int, default=3)
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against this results file and exit with 1 on a regression')
+    parser.add_argument('--threshold', help='Largest allowed drop in throughput against the baseline, as a fraction', type=float, default=0.3)
+    parser.add_argument('--keep-files', help='Generate the files into this directory and keep them')
+    args = parser.parse_args()
+
+    config = {
+        'sections': args.sections,
+        'symbols': args.symbols,
+        'repeat': args.repeat,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+    if args.keep_files:
+        os.makedirs(args.keep_files, exist_ok=True)
+        results = runBenchmarks(args.classes, args.endians, args.sections, args.symbols, args.repeat, args.keep_files)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            results = runBenchmarks(args.classes, args.endians, args.sections, args.symbols, args.repeat, directory)
+    report = {'config': config, 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as outputFile:
+            json.dump(report, outputFile, indent=2, sort_keys=True)
+            outputFile.write('\n')
+    if args.baseline:
+        with open(args.baseline) as baselineFile:
+            baseline = json.load(baselineFile)
+        if baseline.get('config', {}).get('symbols') != args.symbols or baseline.get('config', {}).get('sections') != args.sections:
+            print('warning: the baseline was recorded with a different file size, throughput may not be comparable', file=sys.stderr)
+        regressions = findRegressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print('regression: ' + regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print('no stage regressed by more than %d%% against %s' %(args.threshold * 100, args.baseline), file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
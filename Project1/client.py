@@ -0,0 +1,87 @@
+from readelf_clone.serverProtocol import defaultSocketPath, encodeMessage, decodeMessage
+from readelf_clone.renderers import TABLES, renderers
+from readelf_clone.symbolQuery import addQueryArguments, getQueryOptions
+import argparse
+import base64
+import socket
+import sys
+import os
+
+def runClient():
+    # Creates the argument parser with the same display options as main.py
+    parser = argparse.ArgumentParser(description='Asks a running main.py --serve server to display an ELF file', usage=msg())
+    parser.add_argument("-a", "--all", help="Display all information", action='store_true', required=False)
+    parser.add_argument("-H", "--header", help="Display the ELF file header", action='store_true' , required=False)
+    parser.add_argument("-S", "--section", help="Display the section headers", action='store_true' , required=False)
+    parser.add_argument("-l","--program", help="Displays the program headers and the sections in each segment", action='store_true' , required=False)
+    parser.add_argument("-s", "--symbol", help="Displays the symbol table", action='store_true' , required=False)
+    parser.add_argument("-d", "--dynamicsymbol", help="Display the dynamic symbol table", action='store_true', required=False)
+    parser.add_argument("-D", "--dynamic", help="Display the dynamic section", action='store_true', required=False)
+    parser.add_argument("-r", "--relocs", help="Display the relocations", action='store_true', required=False)
+    parser.add_argument("-n", "--notes", help="Display the notes", action='store_true', required=False)
+    addQueryArguments(parser)
+    parser.add_argument("--output-format", help="Format the tables are written in", choices=sorted(renderers), default='text', required=False)
+    parser.add_argument("--socket", help="Unix socket of the server (default: %(default)s)", default=defaultSocketPath(), required=False)
+    parser.add_argument("--port", help="Connect to a server listening on this localhost TCP port instead of a Unix socket", type=int, default=None, required=False)
+    parser.add_argument("--upload", help="Send the contents of the file instead of its path, for servers that cannot read it", action='store_true', required=False)
+    parser.add_argument('filepath')
+    args = parser.parse_args()
+
+    request = {'format': args.output_format}
+    selected = [option for option, _, _, _, _ in TABLES if getattr(args, option)]
+    request['tables'] = None if args.all or not selected else selected
+    query = getQueryOptions(args)
+    if query is not None:
+        request['symbols'] = query
+    if args.upload:
+        with open(args.filepath, 'rb') as elfFile:
+            request['data'] = base64.b64encode(elfFile.read()).decode()
+    else:
+        request['path'] = os.path.abspath(args.filepath)
+
+    if args.port is not None:
+        connection = socket.create_connection(('127.0.0.1', args.port))
+    else:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(args.socket)
+    with connection:
+        connection.sendall(encodeMessage(request))
+        with connection.makefile('rb') as stream:
+            response = decodeMessage(stream.readline())
+    if not response['ok']:
+        print(response['error'], file=sys.stderr)
+        sys.exit(1)
+    sys.stdout.write(response['output'])
+
+def msg():
+    return '''python client.py <options> "full path to elf file"
+        -a --all              Display all information
+        -H --header           Display the ELF file header
+        -S --section          Display the section headers
+        -l --program          Displays the program headers and the sections in each segment
+        -s --symbol           Displays the symbol table
+        -d --dynamicsymbol    Display the dynamic symbol table
+        -D --dynamic          Display the dynamic section
+        -r --relocs           Display the relocations
+        -n --notes            Display the notes
+        --output-format FMT   Write the tables as text (default), jsonl or csv
+        --socket PATH         Unix socket the server listens on
+        --port N              Connect to a server on localhost port N instead, which only displays uploaded files
+                              or files under its --server-root
+        --upload              Send the file's contents instead of its path
+
+       symbol filters (with -s and -d), checked before symbols are named or decoded
+        --name GLOB           Only list symbols whose name matches GLOB (repeatable)
+        --regex REGEX         Only list symbols whose name contains a match for REGEX
+        --type TYPE           Only list symbols of TYPE, such as FUNC or OBJECT (repeatable)
+        --bind BIND           Only list symbols with binding BIND, such as GLOBAL (repeatable)
+        --visibility VIS      Only list symbols with visibility VIS, such as DEFAULT (repeatable)
+        --ndx N               Only list symbols in section N (repeatable)
+        --min-size/--max-size N     Only list symbols sized between the bounds
+        --min-value/--max-value N   Only list symbols with values between the bounds
+        --sort size|value|name      List by decreasing size, or increasing value or name
+        --top N               Only list the first N symbols (by size unless --sort is given)
+    '''
+
+if __name__ == '__main__':
+    runClient()
@@ -1,56 +1,251 @@
 from readelf_clone.elf import Elf
+from readelf_clone.batchScan import scanFiles
+from readelf_clone.headerTriage import triageFiles
+from readelf_clone.dependencyResolver import DependencyResolver
+from readelf_clone.buildIdIndex import BuildIdIndex, defaultIndexPath
+from readelf_clone.elfServer import ElfServer
+from readelf_clone.elfDiff import diffFiles
+from readelf_clone.sectionEntropy import measureFile
+from readelf_clone.columnarExport import exportTables, EXPORT_FORMATS
+from readelf_clone.serverProtocol import defaultSocketPath
+from readelf_clone.parseCache import openCache, defaultCachePath
+from readelf_clone.renderers import createRenderer, openOutput, renderers, renderTables, TABLES
+from readelf_clone.parseStats import ParseStats
+from readelf_clone.symbolQuery import addQueryArguments, getQueryOptions, createTransform
 import argparse
+import json
+import re
+import sys
 def parseElf():
     # Creates the argument parser and displays the custom user manager
     parser = argparse.ArgumentParser(description='A simple CLI clone of readelf', usage=msg())
     parser.add_argument("-a", "--all", help="Display all information", action='store_true', required=False)
     parser.add_argument("-H", "--header", help="Display the ELF file header", action='store_true' , required=False)
     parser.add_argument("-S", "--section", help="Display the section headers", action='store_true' , required=False)
-    parser.add_argument("-l","--program", help="Displays the program headers", action='store_true' , required=False)
+    parser.add_argument("-l","--program", help="Displays the program headers and the sections in each segment", action='store_true' , required=False)
     parser.add_argument("-s", "--symbol", help="Displays the symbol table", action='store_true' , required=False)
     parser.add_argument("-d", "--dynamicsymbol", help="Display the dynamic symbol table", action='store_true', required=False)
-    parser.add_argument('filepath')
+    parser.add_argument("-D", "--dynamic", help="Display the dynamic section", action='store_true', required=False)
+    parser.add_argument("-r", "--relocs", help="Display the relocations", action='store_true', required=False)
+    parser.add_argument("-n", "--notes", help="Display the notes", action='store_true', required=False)
+    addQueryArguments(parser)
+    parser.add_argument("--output-format", help="Format the tables are written in", choices=sorted(renderers), default='text', required=False)
+    parser.add_argument("--export", help="Write the section headers and symbol tables as columnar files into this directory", default=None, required=False)
+    parser.add_argument("--export-format", help="Format of the files written by --export", choices=sorted(EXPORT_FORMATS), default='parquet', required=False)
+    parser.add_argument("--diff", help="Compare the sections and symbols of two files, given as OLD NEW", action='store_true', required=False)
+    parser.add_argument("--entropy", help="Print the entropy, SHA-256 and fuzzy hash of every section of each file given", action='store_true', required=False)
+    parser.add_argument("--batch", help="Scan every file and directory given and print one JSON record per file", action='store_true', required=False)
+    parser.add_argument("--triage", help="Classify every file and directory given from its header alone and print one JSON record per file", action='store_true', required=False)
+    parser.add_argument("--deps", help="Resolve the shared library dependencies of every file and directory given and print one JSON report per file", action='store_true', required=False)
+    parser.add_argument("--sysroot", help="Root directory libraries are searched for in by --deps", default='/', required=False)
+    parser.add_argument("--library-path", help="Directory searched by --deps before the system directories, like LD_LIBRARY_PATH (repeatable)", action='append', default=[], required=False)
+    parser.add_argument("--build-id-index", help="Add every file under the files and directories given to the build ID index, only reading files that changed", action='store_true', required=False)
+    parser.add_argument("--find-build-id", help="Print the indexed paths of the files with this build ID", required=False)
+    parser.add_argument("--index", help="Path of the build ID index (default: %(default)s)", default=defaultIndexPath(), required=False)
+    parser.add_argument("--serve", help="Run a server that displays files for client.py until interrupted", action='store_true', required=False)
+    parser.add_argument("--socket", help="Unix socket the server listens on (default: %(default)s)", default=defaultSocketPath(), required=False)
+    parser.add_argument("--tcp", help="Let --serve listen on localhost TCP --port instead of a Unix socket, serving only uploads or files under --server-root", action='store_true', required=False)
+    parser.add_argument("--port", help="Localhost TCP port --serve --tcp listens on", type=int, default=None, required=False)
+    parser.add_argument("--server-root", help="Only let --serve read files under this directory", default=None, required=False)
+    parser.add_argument("--server-cache", help="Number of rendered results the server keeps", type=int, default=256, required=False)
+    parser.add_argument("-j", "--jobs", help="Number of worker processes used by --batch, --deps, --build-id-index and --serve, or threads used by --entropy and --triage", type=int, default=None, required=False)
+    parser.add_argument("--chunk-size", help="Number of files handed to a worker at a time by --batch and --triage", type=int, default=64, required=False)
+    parser.add_argument("--include", help="When walking directories, only scan files matching this glob (repeatable)", action='append', default=[], required=False)
+    parser.add_argument("--exclude", help="When walking directories, skip files matching this glob (repeatable)", action='append', default=[], required=False)
+    parser.add_argument("--cache", help="Read and store parsed components in the persistent parse cache", action='store_true', required=False)
+    parser.add_argument("--cache-path", help="Path of the persistent parse cache (default: %(default)s)", default=defaultCachePath(), required=False)
+    parser.add_argument("--no-cache", help="Parse without reading or writing the parse cache, even when --cache is given", action='store_true', required=False)
+    parser.add_argument("--rebuild-cache", help="Ignore what the parse cache holds and store freshly parsed results", action='store_true', required=False)
+    parser.add_argument("--cache-hash", help="Key the parse cache by a SHA-256 of the contents so identical files share entries", action='store_true', required=False)
+    parser.add_argument("--cache-size", help="Largest size of the parse cache in MB before old entries are evicted", type=int, default=256, required=False)
+    parser.add_argument("--profile", help="Print the reads and the time spent in each parsing phase to stderr", nargs='?', const='text', choices=['text', 'json'], default=None, required=False)
+    parser.add_argument('filepath', nargs='*')
     args = parser.parse_args()
-    
-    # Checks that user put a file path
+
+    # The parse cache is only used when asked for with --cache
+    cacheOptions = None
+    if args.cache and not args.no_cache:
+        cacheOptions = {
+            'path': args.cache_path,
+            'maxBytes': args.cache_size * 1024 * 1024,
+            'hashContents': args.cache_hash,
+            'rebuild': args.rebuild_cache,
+        }
+
+    if args.find_build_id:
+        index = BuildIdIndex(args.index)
+        for path in index.lookup(args.find_build_id):
+            print(path)
+        index.close()
+        return
+    if args.serve:
+        if args.tcp != (args.port is not None):
+            parser.error('--serve listens on TCP only with both --tcp and --port')
+        ElfServer(args.socket, args.port, args.jobs, args.server_cache, cacheOptions, args.server_root).run()
+        return
     if not args.filepath:
-        parser.print_usage()
-        exit()
-    
+        parser.error('the following arguments are required: filepath')
+    if args.build_id_index:
+        index = BuildIdIndex(args.index)
+        print(json.dumps(index.update(args.filepath, args.include, args.exclude, args.jobs)))
+        index.close()
+        return
+    if args.batch:
+        for record in scanFiles(args.filepath, args.jobs, args.chunk_size, args.include, args.exclude, cacheOptions):
+            print(json.dumps(record), flush=True)
+        return
+    if args.triage:
+        output = openOutput()
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        for record in triageFiles(args.filepath, args.jobs, args.chunk_size, args.include, args.exclude):
+            output.write(encode(record) + '\n')
+        output.close()
+        return
+    if args.deps:
+        resolver = DependencyResolver(args.sysroot, args.library_path, args.jobs, cacheOptions=cacheOptions)
+        for report in resolver.resolve(args.filepath, args.include, args.exclude):
+            print(json.dumps(report), flush=True)
+        return
+    if args.diff:
+        if len(args.filepath) != 2:
+            parser.error('--diff takes exactly two file paths, OLD NEW')
+        cache = openCache(cacheOptions)
+        diff = diffFiles(args.filepath[0], args.filepath[1], cache)
+        output = openOutput()
+        renderer = createRenderer(args.output_format, output)
+        renderer.caption('\nDifferences from %s to %s' %(args.filepath[0], args.filepath[1]))
+        renderer.render('diff', diff)
+        renderer.caption('\n' + ', '.join('%s: %+d' %(name, value) if 'delta' in name else '%s: %d' %(name, value) for name, value in diff.getSummary().items()))
+        output.close()
+        if cache is not None:
+            cache.close()
+        return
+    if args.entropy:
+        cache = openCache(cacheOptions)
+        output = openOutput()
+        renderer = createRenderer(args.output_format, output)
+        for path in args.filepath:
+            report = measureFile(path, args.jobs, cache)
+            renderer.caption('\nSection entropy of %s' %(path))
+            renderer.render('entropy', report)
+        output.close()
+        if cache is not None:
+            cache.close()
+        return
+    if len(args.filepath) > 1:
+        parser.error('more than one file path requires --batch, --deps or --entropy')
+    args.filepath = args.filepath[0]
+
+    if args.export:
+        with open(args.filepath, 'rb') as elfFile:
+            elf = Elf(elfFile)
+            try:
+                written = exportTables(elf, args.export, args.export_format)
+            except ImportError as error:
+                parser.error(str(error))
+            finally:
+                elf.close()
+        for table, rows, path in written:
+            print('Wrote %d rows of %s to %s' %(rows, table, path))
+        return
+
     # Sets the program to print all components if just the file path is supplied
-    if not any([args.all, args.header, args.section, args.program, args.symbol, args.dynamicsymbol]):
+    if not any([args.all, args.header, args.section, args.program, args.symbol, args.dynamicsymbol, args.dynamic, args.relocs, args.notes]):
         args.all = True
 
+    try:
+        transform = createTransform(getQueryOptions(args))
+    except (ValueError, re.error) as error:
+        parser.error(str(error))
+
+    cache = openCache(cacheOptions)
+    output = openOutput()
+    renderer = createRenderer(args.output_format, output)
+    stats = ParseStats() if args.profile else None
     with open(args.filepath, 'rb') as elfFile:
-        elf = Elf(elfFile)
-        if args.header or args.all:
-            print('\nDisplaying the ELF header')
-            elf.header.getHeader()
-        if args.program or args.all:
-            print('\nDisplaying the program headers')
-            elf.programHeader.getEntries()
-        if args.section or args.all:
-            print('\nDisplaying the section headers')
-            elf.sectionHeader.getSections()
-        if args.symbol or args.all and elf.sectionHeader.indexSYMTAB != -1:
-            print('\nDisplaying the symbol table')
-            elf.symbolTable.getSymbolTable()
-        else:
-            print("\nThere is no symbol table")
-        if args.dynamicsymbol or args.all and elf.sectionHeader.indexDYNSYM != -1:
-            print('\nDisplaying the dynamic symbol table')
-            elf.dynamicSymbolTable.getSymbolTable()
+        elf = Elf(elfFile, cache, stats)
+        renderTables(elf, renderer, None if args.all else {option for option, _, _, _, _ in TABLES if getattr(args, option)}, transform)
+        elf.close()
+    output.close()
+    if cache is not None:
+        cache.close()
+    if stats is not None:
+        if args.profile == 'json':
+            print(json.dumps(stats.getSummary()), file=sys.stderr)
         else:
-            print("\nThere is no dynamic symbol table")
+            print('\nParse profile\n' + stats.formatText(), file=sys.stderr)
 
 def msg():
     return '''python main.py <options> "full path to elf file"
         -a --all              Display all information
         -H --header           Display the ELF file header
         -S --section          Display the section headers
-        -l --program          Displays the program headers
+        -l --program          Displays the program headers and the sections in each segment
         -s --symbol           Displays the symbol table
         -d --dynamicsymbol    Display the dynamic symbol table
+        -D --dynamic          Display the dynamic section
+        -r --relocs           Display the relocations
+        -n --notes            Display the notes
+        --output-format FMT   Write the tables as text (default), jsonl or csv
+        --profile [text|json] Print the reads and time spent in each parsing phase to stderr
+
+       symbol filters (with -s and -d), checked before symbols are named or decoded
+        --name GLOB           Only list symbols whose name matches GLOB (repeatable)
+        --regex REGEX         Only list symbols whose name contains a match for REGEX
+        --type TYPE           Only list symbols of TYPE, such as FUNC or OBJECT (repeatable)
+        --bind BIND           Only list symbols with binding BIND, such as GLOBAL (repeatable)
+        --visibility VIS      Only list symbols with visibility VIS, such as DEFAULT (repeatable)
+        --ndx N               Only list symbols in section N (repeatable)
+        --min-size/--max-size N     Only list symbols sized between the bounds
+        --min-value/--max-value N   Only list symbols with values between the bounds
+        --sort size|value|name      List by decreasing size, or increasing value or name
+        --top N               Only list the first N symbols (by size unless --sort is given)
+
+       python main.py --export DIR [--export-format parquet|arrow|npz] "full path to elf file"
+        Writes the section headers and symbol tables as columns for pandas and other dataframe tools.
+        Needs NumPy, and pyarrow for Parquet and Arrow.
+
+       python main.py --diff [--output-format FMT] "old elf file" "new elf file"
+
+       python main.py --entropy [-j N] [--output-format FMT] "elf files" ...
+        -j --jobs N           Number of sections measured at once (defaults to the CPU count)
+
+       python main.py --batch <batch options> "files or directories" ...
+        -j --jobs N           Number of worker processes (defaults to the CPU count)
+        --chunk-size N        Number of files handed to a worker at a time
+        --include GLOB        When walking directories, only scan files matching GLOB
+        --exclude GLOB        When walking directories, skip files matching GLOB
+
+       python main.py --triage [-j N] [--chunk-size N] "files or directories" ...
+        Reads only the first 64 bytes of every file and prints its class, data encoding, OS/ABI, type and
+        machine numbers, or why it was skipped. -j is the number of threads reading at once.
+        --include and --exclude work as they do for --batch
+
+       python main.py --deps <dependency options> "files or directories" ...
+        --sysroot DIR         Resolve libraries inside DIR instead of /
+        --library-path DIR    Search DIR before the system directories (repeatable)
+        -j, --include and --exclude work as they do for --batch
+
+       python main.py --build-id-index [--index PATH] "files or directories" ...
+       python main.py --find-build-id ID [--index PATH]
+        --index PATH          Location of the build ID index
+        -j, --include and --exclude work as they do for --batch
+
+       python main.py --serve <server options>
+        --socket PATH         Listen on the Unix socket PATH, reachable only by its owner
+        --tcp --port N        Listen on localhost port N instead, which any local user can reach: only uploaded
+                              files, or files under --server-root, are displayed
+        --server-root DIR     Only display files under DIR
+        --server-cache N      Number of rendered results kept in memory
+        -j                    Number of worker processes
+
+       parse cache options (all modes), the cache is off unless --cache is given
+        --cache               Use the parse cache
+        --cache-path PATH     Location of the parse cache
+        --no-cache            Do not read or write the parse cache
+        --rebuild-cache       Replace cached results with freshly parsed ones
+        --cache-hash          Share cached results between identical files
+        --cache-size MB       Evict old entries beyond this size
     '''
 
 if __name__ == '__main__':
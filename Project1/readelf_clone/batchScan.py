@@ -0,0 +1,133 @@
+import os
+import sys
+import sqlite3
+from fnmatch import fnmatch
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from readelf_clone.elf import Elf
+from readelf_clone.parseCache import openCache
+
+ELF_MAGIC = b"\x7fELF"
+
+# The parse cache opened by each worker process, None when caching is off
+workerCache = None
+
+# Opens the parse cache once per worker process, running the worker uncached when it cannot be opened
+def initWorker(cacheOptions):
+    global workerCache
+    workerCache = openCache(cacheOptions)
+
+# Writes what the worker's parse cache has buffered, since workers never close it. A cache that cannot be written
+# (for example while another process holds it locked) keeps its writes for the next flush rather than failing the work.
+def flushWorkerCache():
+    if workerCache is None:
+        return
+    try:
+        workerCache.flush()
+    except sqlite3.Error as error:
+        print('warning: could not write the parse cache: %s' %(error), file=sys.stderr)
+
+# Returns True when a path matches any of the glob patterns, checked against both the file name and the full path
+def matchesAny(path, patterns):
+    name = os.path.basename(path)
+    return any(fnmatch(name, pattern) or fnmatch(path, pattern) for pattern in patterns)
+
+# Yields every regular file under the given paths, descending into directories and applying the include and exclude globs
+def findFiles(paths, include=None, exclude=None):
+    include = include or []
+    exclude = exclude or []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    candidate = os.path.join(root, name)
+                    if os.path.islink(candidate) or not os.path.isfile(candidate):
+                        continue
+                    if include and not matchesAny(candidate, include):
+                        continue
+                    if exclude and matchesAny(candidate, exclude):
+                        continue
+                    yield candidate
+        else:
+            # Paths named explicitly are always scanned
+            yield path
+
+# Parses one file and returns a summary record, or a record with the reason it was skipped
+def scanFile(path, cache=None):
+    try:
+        with open(path, 'rb') as elfFile:
+            # Reads the magic number first so non-ELF files cost one small read
+            if elfFile.read(len(ELF_MAGIC)) != ELF_MAGIC:
+                return {'path': path, 'skipped': 'not an ELF file'}
+            elfFile.seek(0)
+            elf = Elf(elfFile, cache)
+            try:
+                header = elf.header
+                symbolTable = elf.symbolTable
+                dynamicSymbolTable = elf.dynamicSymbolTable
+                return {
+                    'path': path,
+                    'class': header.safeget('Class', header.e_ident['ei_class']),
+                    'data': header.safeget('Data', header.e_ident['ei_data']),
+                    'type': header.safeget('Type', header.e_type),
+                    'machine': header.safeget('Machine', header.e_machine),
+                    'entry': header.e_entry,
+                    'programHeaders': len(elf.programHeader.entries),
+                    'sections': len(elf.sectionHeader.entries),
+                    'symbols': len(symbolTable.entries) if symbolTable is not None else 0,
+                    'dynamicSymbols': len(dynamicSymbolTable.entries) if dynamicSymbolTable is not None else 0,
+                }
+            finally:
+                elf.close()
+    except Exception as error:
+        return {'path': path, 'error': str(error)}
+
+# Scans a chunk of paths inside a worker process
+def scanChunk(paths):
+    records = [scanFile(path, workerCache) for path in paths]
+    flushWorkerCache()
+    return records
+
+# Splits an iterable of paths into lists of at most size paths
+def chunked(paths, size):
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Scans every file under the given paths with a pool of worker processes and yields one record per file as chunks complete.
+# Only a bounded number of chunks are in flight at once so huge trees are never listed or held in memory up front.
+# cacheOptions are the ParseCache arguments each worker opens its cache with, or None to parse without a cache.
+# Source: https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+def scanFiles(paths, workers=None, chunkSize=64, include=None, exclude=None, cacheOptions=None):
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(findFiles(paths, include, exclude), chunkSize)
+    if workers == 1:
+        initWorker(cacheOptions)
+        try:
+            for chunk in chunks:
+                yield from scanChunk(chunk)
+        finally:
+            if workerCache is not None:
+                workerCache.close()
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=initWorker, initargs=(cacheOptions,)) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(scanChunk, chunk))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+    # Workers never close their caches, so the size limit is enforced once the whole batch is stored
+    cache = openCache(cacheOptions)
+    if cache is not None:
+        cache.close()
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from readelf_clone.batchScan import findFiles, chunked
+from readelf_clone.notes import readBuildId
+from readelf_clone.parseCache import fileIdentity
+
+# Where the index lives when no path is given, next to the parse cache
+def defaultIndexPath():
+    cacheHome = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cacheHome, 'readelf_clone', 'build-id-index.sqlite')
+
+# Reads the build IDs of a chunk of paths inside a worker process. Files that cannot be read are indexed without a build ID.
+def readChunk(paths):
+    results = []
+    for path, identity in paths:
+        try:
+            buildId = readBuildId(path)
+        except Exception:
+            buildId = None
+        results.append((path, identity, buildId))
+    return results
+
+class BuildIdIndex():
+    # A SQLite file mapping GNU build IDs to the paths of the files carrying them, kept between runs.
+    # Updating an index only reads the build ID of files that are new or whose identity changed since the last update,
+    # and forgets files that disappeared from the directories scanned.
+    # Source: https://docs.python.org/3/library/sqlite3.html
+    def __init__(self, path=None) -> None:
+        self.path = path or defaultIndexPath()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, identity TEXT NOT NULL, buildId TEXT)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS filesByBuildId ON files (buildId)')
+        self.connection.commit()
+
+    # Brings the index up to date with every file under paths and returns how many files were added, updated, removed and left unchanged
+    def update(self, paths, include=None, exclude=None, workers=None, chunkSize=256):
+        counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        roots = [os.path.abspath(path) for path in paths]
+        known = {}
+        for root in roots:
+            pattern = root.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            rows = self.connection.execute("SELECT path, identity FROM files WHERE path = ? OR path LIKE ? ESCAPE '\\'", (root, os.path.join(pattern, '%')))
+            known.update(rows)
+        stale = []
+        seen = set()
+        for path in findFiles(roots, include, exclude):
+            try:
+                identity = fileIdentity(os.stat(path))
+            except OSError:
+                continue
+            seen.add(path)
+            if known.get(path) == identity:
+                counts['unchanged'] += 1
+            else:
+                stale.append((path, identity))
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(stale) <= chunkSize:
+            results = readChunk(stale)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = [result for chunk in executor.map(readChunk, chunked(stale, chunkSize)) for result in chunk]
+        for path, identity, buildId in results:
+            counts['updated' if path in known else 'added'] += 1
+        self.connection.executemany('INSERT OR REPLACE INTO files (path, identity, buildId) VALUES (?, ?, ?)', results)
+
+        removed = [(path,) for path in known if path not in seen]
+        counts['removed'] = len(removed)
+        self.connection.executemany('DELETE FROM files WHERE path = ?', removed)
+        self.connection.commit()
+        return counts
+
+    # Returns the paths of every indexed file with the given build ID
+    def lookup(self, buildId):
+        rows = self.connection.execute('SELECT path FROM files WHERE buildId = ? ORDER BY path', (buildId.lower(),))
+        return [path for (path,) in rows]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,204 @@
+import os
+from readelf_clone.elfStructs import recordFormats, byteOrder
+from readelf_clone.symbolTable import FIELD_ORDER
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# The fields of a section header, in the same order in both classes
+SECTION_FIELDS = ('sh_name', 'sh_type', 'sh_flags', 'sh_addr', 'sh_offset', 'sh_size', 'sh_link', 'sh_info', 'sh_addralign', 'sh_entsize')
+# The NumPy type of each struct format character
+NUMPY_TYPES = {
+    'B': 'u1',
+    'H': 'u2',
+    'I': 'u4',
+    'Q': 'u8',
+    'i': 'i4',
+    'q': 'i8',
+}
+# File extension written by each export format
+EXPORT_FORMATS = {
+    'parquet': 'parquet',
+    'arrow': 'arrow',
+    'npz': 'npz',
+}
+SHT_SYMTAB = 2
+SHT_DYNSYM = 11
+
+# Raises ImportError when NumPy, or pyarrow when needed for the format, is not installed
+def requireModules(needArrow=False):
+    if numpy is None:
+        raise ImportError('The columnar export needs NumPy (pip install numpy)')
+    if needArrow and pyarrow is None:
+        raise ImportError('Parquet and Arrow output need pyarrow (pip install pyarrow)')
+
+# Returns the structured dtype matching a record of elfStructs with the given field names, stride bytes per record.
+# Source: https://numpy.org/doc/stable/user/basics.rec.html
+def createDtype(record, fields, ei_class, ei_data, stride=None):
+    prefix = byteOrder[ei_data]
+    formats = [prefix + NUMPY_TYPES[code] for code in recordFormats[record][ei_class]]
+    offsets = []
+    offset = 0
+    for dtypeFormat in formats:
+        offsets.append(offset)
+        offset += numpy.dtype(dtypeFormat).itemsize
+    return numpy.dtype({'names': list(fields), 'formats': formats, 'offsets': offsets, 'itemsize': stride or offset})
+
+# Returns a field of a structured array as a contiguous array in the native byte order, the form pyarrow and pandas take
+def nativeColumn(records, field):
+    column = records[field]
+    return numpy.ascontiguousarray(column, dtype=column.dtype.newbyteorder('='))
+
+# Returns the NUL terminated strings of blob starting at each offset as (value offsets, bytes), the layout of an Arrow
+# string column: string i is data[offsets[i]:offsets[i + 1]]. Offsets outside of blob give empty strings.
+# The end of every string is found with one searchsorted over the positions of the NULs and the bytes are gathered
+# with one fancy index, so no Python object is made per string.
+def gatherStrings(blob, starts):
+    starts = numpy.where(starts < len(blob), starts, len(blob)).astype(numpy.int64)
+    nuls = numpy.flatnonzero(blob == 0)
+    if len(nuls):
+        positions = numpy.searchsorted(nuls, starts)
+        ends = numpy.where(positions < len(nuls), nuls[numpy.minimum(positions, len(nuls) - 1)], len(blob))
+    else:
+        ends = numpy.full(len(starts), len(blob), dtype=numpy.int64)
+    lengths = ends - starts
+    offsets = numpy.zeros(len(starts) + 1, dtype=numpy.int64)
+    numpy.cumsum(lengths, out=offsets[1:])
+    gather = numpy.arange(offsets[-1], dtype=numpy.int64) - numpy.repeat(offsets[:-1] - starts, lengths)
+    return offsets, blob[gather]
+
+# Returns the bytes of a section as a uint8 array, empty when the section is outside of the file
+def sectionBytes(elf, section):
+    if section is None or section.sh_offset + section.sh_size > elf.data.size:
+        return numpy.zeros(0, dtype=numpy.uint8)
+    return numpy.frombuffer(elf.data.view(section.sh_offset, section.sh_size), dtype=numpy.uint8)
+
+class ColumnTable():
+    # A table held as one NumPy array per column plus string columns kept as (value offsets, bytes) pairs.
+    # It converts to a pyarrow Table without building Python objects per row, and is written as Parquet, an Arrow IPC
+    # file or an .npz of arrays (the string columns stored as <name>_offsets and <name>_data).
+    def __init__(self, columns, strings) -> None:
+        self.columns = columns
+        self.strings = strings
+
+    # Returns the number of rows
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    # Returns every column as NumPy arrays keyed by name
+    def toNumpy(self):
+        arrays = {}
+        for name, (offsets, data) in self.strings.items():
+            arrays[name + '_offsets'] = offsets
+            arrays[name + '_data'] = data
+        arrays.update(self.columns)
+        return arrays
+
+    # Returns a string column as an Arrow array built straight from its buffers, or a binary array when a name is not UTF-8
+    # Source: https://arrow.apache.org/docs/format/Columnar.html#variable-size-binary-layout
+    def createStringArray(self, offsets, data):
+        large = offsets[-1] >= 2 ** 31
+        offsetBuffer = pyarrow.py_buffer(offsets if large else offsets.astype(numpy.int32))
+        arrayType = pyarrow.LargeStringArray if large else pyarrow.StringArray
+        array = arrayType.from_buffers(len(offsets) - 1, offsetBuffer, pyarrow.py_buffer(data))
+        try:
+            array.validate(full=True)
+        except pyarrow.ArrowInvalid:
+            arrayType = pyarrow.LargeBinaryArray if large else pyarrow.BinaryArray
+            array = arrayType.from_buffers(len(offsets) - 1, offsetBuffer, pyarrow.py_buffer(data))
+        return array
+
+    # Returns the table as a pyarrow Table with the string columns first
+    def toArrow(self):
+        requireModules(True)
+        names = list(self.strings) + list(self.columns)
+        arrays = [self.createStringArray(*self.strings[name]) for name in self.strings]
+        arrays += [pyarrow.array(column) for column in self.columns.values()]
+        return pyarrow.table(arrays, names=names)
+
+    # Writes the table to path in one of EXPORT_FORMATS
+    # Source:
+    #    https://arrow.apache.org/docs/python/parquet.html
+    #    https://arrow.apache.org/docs/python/ipc.html
+    def write(self, path, exportFormat):
+        if exportFormat == 'npz':
+            numpy.savez(path, **self.toNumpy())
+        elif exportFormat == 'parquet':
+            pyarrow.parquet.write_table(self.toArrow(), path)
+        else:
+            table = self.toArrow()
+            with pyarrow.OSFile(path, 'wb') as sink, pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+# Decodes the section header table of an Elf into columns with one numpy.frombuffer, named from the section header string table
+def decodeSectionColumns(elf):
+    requireModules()
+    header = elf.header
+    ei_class, ei_data = header.getArchitecture(), header.getDataEncoding()
+    count = header.getSectionHeaderNumber()
+    dtype = createDtype('SectionHeader', SECTION_FIELDS, ei_class, ei_data, header.getSectionHeaderSize() or None)
+    records = numpy.frombuffer(elf.data.view(header.getSectionHeaderOffset(), count * dtype.itemsize), dtype=dtype) if count else numpy.zeros(0, dtype=dtype)
+    sectionHeader = elf.sectionHeader
+    stringSection = sectionHeader.entries[header.getStringTableIndex()] if header.getStringTableIndex() < len(sectionHeader.entries) else None
+    columns = {'index': numpy.arange(count, dtype=numpy.int64)}
+    columns.update((field, nativeColumn(records, field)) for field in SECTION_FIELDS)
+    return ColumnTable(columns, {'name': gatherStrings(sectionBytes(elf, stringSection), columns['sh_name'])})
+
+# Decodes .dynsym (dynamic) or .symtab of an Elf into columns with one numpy.frombuffer, or returns None when the file
+# has no such table. st_type, st_bind and st_vis are derived from st_info and st_other with vectorized bit operations.
+# Names come from the string table, and SECTION symbols without a name are named after their section as in the text table.
+def decodeSymbolColumns(elf, dynamic=False):
+    requireModules()
+    sectionHeader = elf.sectionHeader
+    index = sectionHeader.indexDYNSYM if dynamic else sectionHeader.indexSYMTAB
+    if index == -1:
+        return None
+    ei_class, ei_data = elf.header.getArchitecture(), elf.header.getDataEncoding()
+    dtype = createDtype('Symbol', FIELD_ORDER[ei_class], ei_class, ei_data)
+    section = sectionHeader.entries[index]
+    count = section.sh_size // dtype.itemsize
+    records = numpy.frombuffer(elf.data.view(section.sh_offset, count * dtype.itemsize), dtype=dtype)
+    columns = {'num': numpy.arange(count, dtype=numpy.int64)}
+    columns.update((field, nativeColumn(records, field)) for field in ('st_name', 'st_value', 'st_size', 'st_info', 'st_other', 'st_shndx'))
+    columns['st_type'] = columns['st_info'] & 15
+    columns['st_bind'] = columns['st_info'] >> 4
+    columns['st_vis'] = columns['st_other'] & 3
+
+    # The string table and the section header string table are joined into one blob, with a NUL between them, so every
+    # name is one gather. Offsets are checked against the table they belong to before being moved into the blob, so an
+    # offset past the end of one table gives an empty name rather than a string of the other.
+    stringIndex = sectionHeader.indexDYNSTR if dynamic else sectionHeader.indexSTRTAB
+    strings = sectionBytes(elf, sectionHeader.entries[stringIndex] if stringIndex != -1 else None)
+    shstrIndex = elf.header.getStringTableIndex()
+    sectionStrings = sectionBytes(elf, sectionHeader.entries[shstrIndex] if shstrIndex < len(sectionHeader.entries) else None)
+    blob = numpy.concatenate((strings, numpy.zeros(1, dtype=numpy.uint8), sectionStrings))
+    sectionNames = numpy.array([entry.sh_name for entry in sectionHeader.entries], dtype=numpy.int64)
+    sectionNames = numpy.where(sectionNames < len(sectionStrings), len(strings) + 1 + sectionNames, len(blob))
+    starts = columns['st_name'].astype(numpy.int64)
+    starts[starts >= len(strings)] = len(blob)
+    namedBySection = (columns['st_name'] == 0) & (columns['st_type'] == 3) & (columns['st_shndx'] < len(sectionNames))
+    starts[namedBySection] = sectionNames[columns['st_shndx'][namedBySection]]
+    return ColumnTable(columns, {'name': gatherStrings(blob, starts)})
+
+# Writes the section headers and both symbol tables of an Elf to directory as <table>.<extension>.
+# Returns (table, rows, path) for every file written.
+def exportTables(elf, directory, exportFormat='parquet'):
+    requireModules(exportFormat != 'npz')
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for table, columns in (('sections', decodeSectionColumns(elf)), ('symbols', decodeSymbolColumns(elf)), ('dynamicSymbols', decodeSymbolColumns(elf, True))):
+        if columns is None:
+            continue
+        path = os.path.join(directory, '%s.%s' %(table, EXPORT_FORMATS[exportFormat]))
+        columns.write(path, exportFormat)
+        written.append((table, len(columns), path))
+    return written
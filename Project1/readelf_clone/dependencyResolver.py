@@ -0,0 +1,274 @@
+import os
+import glob
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from readelf_clone import batchScan
+from readelf_clone.batchScan import ELF_MAGIC, initWorker, findFiles, chunked
+from readelf_clone.elf import Elf
+from readelf_clone.elfStructs import byteOrder
+
+# Directories the dynamic loader always searches last
+# Source: https://man7.org/linux/man-pages/man8/ld.so.8.html
+DEFAULT_LIBRARY_PATH = ['/lib', '/usr/lib', '/lib64', '/usr/lib64']
+STB_LOCAL = 0
+STB_WEAK = 2
+# Visibilities a defined symbol is exported with: DEFAULT and PROTECTED
+EXPORTED_VISIBILITIES = {0, 3}
+
+# Reads the dynamic linking information of one file: its identity for compatibility checks, soname, needed
+# libraries, search paths, exported symbol names and undefined symbol names
+def parseDependencies(path, cache=None):
+    try:
+        with open(path, 'rb') as elfFile:
+            if elfFile.read(len(ELF_MAGIC)) != ELF_MAGIC:
+                return {'path': path, 'skipped': 'not an ELF file'}
+            elfFile.seek(0)
+            elf = Elf(elfFile, cache)
+            try:
+                record = {
+                    'path': path,
+                    'identity': (elf.header.getArchitecture(), elf.header.getDataEncoding(), elf.header.e_machine),
+                    'soname': None,
+                    'needed': [],
+                    'runpath': [],
+                    'rpath': [],
+                    'exported': [],
+                    'undefined': [],
+                }
+                dynamicSection = elf.dynamicSection
+                if dynamicSection is not None:
+                    record['soname'] = dynamicSection.getSoname()
+                    record['needed'] = dynamicSection.getNeeded()
+                    record['runpath'] = dynamicSection.getRunpath()
+                    record['rpath'] = dynamicSection.getRpath()
+                if elf.dynamicSymbolTable is not None:
+                    for entry in elf.dynamicSymbolTable.entries:
+                        if entry.st_bind == STB_LOCAL or entry.st_converted_name == 'NULL':
+                            continue
+                        if entry.st_shndx == 0:
+                            record['undefined'].append((entry.st_converted_name, entry.st_bind == STB_WEAK))
+                        elif entry.st_vis in EXPORTED_VISIBILITIES:
+                            record['exported'].append(entry.st_converted_name)
+                return record
+            finally:
+                elf.close()
+    except Exception as error:
+        return {'path': path, 'error': str(error)}
+
+# Parses a chunk of paths inside a worker process
+def parseChunk(paths):
+    records = [parseDependencies(path, batchScan.workerCache) for path in paths]
+    batchScan.flushWorkerCache()
+    return records
+
+# Returns the (class, data encoding, machine) of the file at path from its first 20 bytes, or None when it is not an ELF file
+def readIdentity(path):
+    try:
+        with open(path, 'rb') as elfFile:
+            ident = elfFile.read(20)
+    except OSError:
+        return None
+    if len(ident) < 20 or ident[:4] != ELF_MAGIC or ident[5] not in byteOrder:
+        return None
+    return (ident[4], ident[5], struct.unpack_from(byteOrder[ident[5]] + 'H', ident, 18)[0])
+
+# Returns the library directories listed in etc/ld.so.conf under sysroot, following its include lines
+# Source: https://man7.org/linux/man-pages/man8/ldconfig.8.html
+def readLdSoConf(sysroot, path='/etc/ld.so.conf', seen=None):
+    seen = set() if seen is None else seen
+    configPath = os.path.join(sysroot, path.lstrip('/'))
+    if configPath in seen:
+        return []
+    seen.add(configPath)
+    try:
+        with open(configPath) as configFile:
+            lines = configFile.read().splitlines()
+    except OSError:
+        return []
+    directories = []
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line or line.startswith('hwcap'):
+            continue
+        if line.startswith('include'):
+            pattern = line.split(None, 1)[1] if len(line.split(None, 1)) > 1 else ''
+            if not pattern.startswith('/'):
+                pattern = os.path.join(os.path.dirname(path), pattern)
+            for included in sorted(glob.glob(os.path.join(sysroot, pattern.lstrip('/')))):
+                directories.extend(readLdSoConf(sysroot, '/' + os.path.relpath(included, sysroot), seen))
+        else:
+            directories.extend(directory for directory in line.replace(',', ' ').split() if directory.startswith('/'))
+    return directories
+
+class DependencyResolver():
+    # Resolves the DT_NEEDED closure of executables the way the dynamic loader would inside sysroot: a needed name
+    # already loaded (by soname or name) is reused, otherwise it is searched for in the DT_RPATH of the loading chain
+    # (when the requesting object has no DT_RUNPATH), libraryPaths (like LD_LIBRARY_PATH), the DT_RUNPATH of the
+    # requesting object, the ld.so.conf directories and finally the default directories. Only files with the same
+    # class, byte order and machine as the requesting object are accepted.
+    # Every file is parsed at most once for the whole run and searches are memoized, so a library shared by thousands
+    # of executables costs one parse. Files are parsed level by level with a pool of worker processes.
+    # Symbol versions are not taken into account when matching undefined symbols to providers.
+    # Source: https://man7.org/linux/man-pages/man8/ld.so.8.html
+    def __init__(self, sysroot='/', libraryPaths=None, workers=None, chunkSize=16, cacheOptions=None, useLdSoConf=True) -> None:
+        self.sysroot = sysroot
+        self.libraryPaths = list(libraryPaths or [])
+        self.workers = workers or os.cpu_count() or 1
+        self.chunkSize = chunkSize
+        self.cacheOptions = cacheOptions
+        self.systemPaths = (readLdSoConf(sysroot) if useLdSoConf else []) + DEFAULT_LIBRARY_PATH
+        # Path -> record returned by parseDependencies
+        self.records = {}
+        # Path -> set of exported names, built when a file is first asked for a symbol
+        self.exports = {}
+        # (name, search directories, identity) -> path found, or None
+        self.searches = {}
+        # Path -> identity read from the header, or None
+        self.identities = {}
+
+    # Maps a directory from a search path into sysroot, expanding $ORIGIN to the directory of the requesting file
+    def expandDirectory(self, directory, origin, ei_class):
+        for token in ('$ORIGIN', '${ORIGIN}'):
+            if token in directory:
+                return os.path.normpath(directory.replace(token, os.path.dirname(origin)))
+        for token in ('$LIB', '${LIB}'):
+            directory = directory.replace(token, 'lib64' if ei_class == 2 else 'lib')
+        return os.path.normpath(os.path.join(self.sysroot, directory.lstrip('/')))
+
+    # Returns the directories searched for the needed entries of path, given the chain of files that loaded it
+    def getSearchPath(self, path, chain):
+        record = self.records[path]
+        ei_class = record['identity'][0]
+        directories = []
+        if not record['runpath']:
+            for loader in [path] + chain[::-1]:
+                directories.extend(self.expandDirectory(directory, loader, ei_class) for directory in self.records[loader]['rpath'])
+        directories.extend(self.expandDirectory(directory, path, ei_class) for directory in self.libraryPaths)
+        directories.extend(self.expandDirectory(directory, path, ei_class) for directory in record['runpath'])
+        directories.extend(self.expandDirectory(directory, path, ei_class) for directory in self.systemPaths)
+        return tuple(dict.fromkeys(directories))
+
+    # Returns the first compatible file called name in the directories, memoized across the whole run
+    def search(self, name, directories, identity):
+        key = (name, directories, identity)
+        if key not in self.searches:
+            found = None
+            if '/' in name:
+                candidates = [self.expandDirectory(name, '', identity[0])]
+            else:
+                candidates = [os.path.join(directory, name) for directory in directories]
+            for candidate in candidates:
+                if candidate not in self.identities:
+                    self.identities[candidate] = readIdentity(candidate)
+                if self.identities[candidate] == identity:
+                    found = os.path.realpath(candidate)
+                    break
+            self.searches[key] = found
+        return self.searches[key]
+
+    # Walks the closure of one executable breadth first, in the order the loader would load it.
+    # Returns the report, or None with the paths that must be parsed first added to missing.
+    def walkClosure(self, path, missing):
+        if path not in self.records:
+            missing.add(path)
+            return None
+        root = self.records[path]
+        if 'identity' not in root:
+            return root
+        loaded = {}
+        order = [path]
+        graph = {}
+        unresolved = set()
+        queue = [(path, [])]
+        complete = True
+        while queue:
+            current, chain = queue.pop(0)
+            record = self.records[current]
+            directories = self.getSearchPath(current, chain)
+            graph[current] = {}
+            for name in record['needed']:
+                provider = loaded.get(name)
+                if provider is None:
+                    provider = self.search(name, directories, root['identity'])
+                    if provider is None:
+                        unresolved.add(name)
+                    elif provider not in self.records:
+                        missing.add(provider)
+                        complete = False
+                    elif 'identity' not in self.records[provider]:
+                        provider = None
+                        unresolved.add(name)
+                    else:
+                        loaded[name] = provider
+                        if provider not in order:
+                            order.append(provider)
+                            if self.records[provider]['soname']:
+                                loaded[self.records[provider]['soname']] = provider
+                            queue.append((provider, chain + [current]))
+                graph[current][name] = provider
+        if not complete:
+            return None
+        return {
+            'path': path,
+            'graph': graph,
+            'loadOrder': order,
+            'missingLibraries': sorted(unresolved),
+            'symbols': self.resolveSymbols(root, order),
+        }
+
+    # Maps every undefined symbol of the root file to the first file in load order exporting it, or None
+    def resolveSymbols(self, root, order):
+        symbols = {}
+        for name, weak in root['undefined']:
+            provider = None
+            for candidate in order[1:]:
+                if candidate not in self.exports:
+                    self.exports[candidate] = set(self.records[candidate]['exported'])
+                if name in self.exports[candidate]:
+                    provider = candidate
+                    break
+            symbols[name] = provider
+        return symbols
+
+    # Parses every path not parsed yet, in parallel when there is more than a chunk of them
+    def parseAll(self, paths, executor):
+        paths = [path for path in paths if path not in self.records]
+        if executor is None or len(paths) <= self.chunkSize:
+            for path in paths:
+                self.records[path] = parseDependencies(path, batchScan.workerCache)
+            return
+        for records in executor.map(parseChunk, chunked(paths, self.chunkSize)):
+            for record in records:
+                self.records[record['path']] = record
+
+    # Yields one report per file under paths: the dependency graph (needed name -> file found, or None, for every
+    # loaded file), the load order, the needed libraries that could not be found and the undefined symbol -> provider map
+    def resolve(self, paths, include=None, exclude=None):
+        targets = [os.path.realpath(path) for path in findFiles(paths, include, exclude)]
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=initWorker, initargs=(self.cacheOptions,))
+        initWorker(self.cacheOptions)
+        try:
+            reports = {}
+            pending = targets
+            # Each round parses the files found by the last one, so the number of rounds is the depth of the deepest closure.
+            # Only the targets whose closure still needs files parsed are walked again.
+            while pending:
+                missing = set()
+                waiting = []
+                for target in pending:
+                    report = self.walkClosure(target, missing)
+                    if report is None:
+                        waiting.append(target)
+                    else:
+                        reports[target] = report
+                self.parseAll(sorted(missing), executor)
+                pending = waiting
+            for target in targets:
+                yield reports[target]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if batchScan.workerCache is not None:
+                batchScan.workerCache.close()
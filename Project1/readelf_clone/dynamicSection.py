@@ -0,0 +1,115 @@
+from readelf_clone.lookupDictionary.lookupDictionary import dtDictionary
+from readelf_clone.elfStructs import getStruct, unpackTable
+from readelf_clone.renderers import TextRenderer
+import sys
+
+SHT_DYNAMIC = 6
+DT_NULL = 0
+DT_NEEDED = 1
+DT_SONAME = 14
+DT_RPATH = 15
+DT_RUNPATH = 29
+# Tags whose value is an offset into the dynamic string table
+STRING_TAGS = {DT_NEEDED, DT_SONAME, DT_RPATH, DT_RUNPATH}
+
+class DynamicSection():
+    # Decodes the .dynamic section up to its DT_NULL terminator. The string valued tags (needed libraries, soname,
+    # rpath and runpath) are resolved through the string table the section links to (.dynstr).
+    # Source:
+    #    https://refspecs.linuxbase.org/elf/gabi4+/ch5.dynamic.html
+    #    https://man7.org/linux/man-pages/man5/elf.5.html
+    def __init__(self, elf, ei_class, ei_data, section, stringTable) -> None:
+        self.elf = elf
+        self.ei_class = ei_class
+        self.ei_data = ei_data
+        self.stringTable = stringTable
+        self.entries = self.createEntries(section)
+
+    # Creates the entries of the section in one pass, stopping at the first DT_NULL
+    def createEntries(self, section):
+        layout = getStruct('Dynamic', self.ei_class, self.ei_data)
+        stride = section.sh_entsize or layout.size
+        entries = []
+        for d_tag, d_val in unpackTable(self.elf, layout, section.sh_offset, section.sh_size // stride, stride):
+            if d_tag == DT_NULL:
+                break
+            entries.append(self.DynamicEntry(d_tag, d_val))
+        return entries
+
+    # Matches the valueKey (typically an attibute of the object) with the corresponding key in the corresponding dictionary
+    def safeget(self, attributeKey, valueKey):
+        try:
+            message = dtDictionary[attributeKey][valueKey]
+        except KeyError:
+            return "Unknown"
+        return message
+
+    # Returns the string values of every entry with the given tag, in the order they appear
+    def getStrings(self, d_tag):
+        return [self.stringTable.getString(entry.d_val) for entry in self.entries if entry.d_tag == d_tag]
+
+    # Returns the DT_NEEDED library names in load order
+    def getNeeded(self):
+        return self.getStrings(DT_NEEDED)
+
+    # Returns the DT_SONAME of the object, or None when it has none
+    def getSoname(self):
+        sonames = self.getStrings(DT_SONAME)
+        return sonames[0] if sonames else None
+
+    # Returns the directories listed in DT_RUNPATH
+    def getRunpath(self):
+        return [directory for value in self.getStrings(DT_RUNPATH) for directory in value.split(':') if directory]
+
+    # Returns the directories listed in DT_RPATH
+    def getRpath(self):
+        return [directory for value in self.getStrings(DT_RPATH) for directory in value.split(':') if directory]
+
+    recordFields = ('d_tag', 'type', 'value')
+    textHeading = '\t%-18s %-20s %s' %('Tag', 'Type', 'Name/Value')
+
+    # Iterates over the list of entries and returns the results from their respective fields.
+    def getDynamicSection(self):
+        TextRenderer(sys.stdout).render('dynamic', self)
+
+    # Yields one record per entry with the string valued tags resolved to their names
+    def iterRecords(self):
+        for entry in self.entries:
+            if entry.d_tag in STRING_TAGS:
+                value = self.stringTable.getString(entry.d_val)
+            else:
+                value = entry.d_val
+            yield {
+                'd_tag': entry.d_tag,
+                'type': self.safeget('Tag', entry.d_tag),
+                'value': value,
+            }
+
+    # Returns the text table line for one record
+    # Source: Visually inspecting readelf results
+    def formatText(self, record):
+        value = record['value']
+        if isinstance(value, int):
+            value = "0x{:x}".format(value)
+        elif record['d_tag'] == DT_NEEDED:
+            value = 'Shared library: [%s]' %(value)
+        elif record['d_tag'] == DT_SONAME:
+            value = 'Library soname: [%s]' %(value)
+        elif record['d_tag'] == DT_RPATH:
+            value = 'Library rpath: [%s]' %(value)
+        else:
+            value = 'Library runpath: [%s]' %(value)
+        # Tags are printed as wide as the class makes them, negative (processor specific) tags as their unsigned value
+        if self.ei_class == 1:
+            tag = "0x{:08x}".format(record['d_tag'] & 0xffffffff)
+        else:
+            tag = "0x{:016x}".format(record['d_tag'] & 0xffffffffffffffff)
+        return '\t%-18s %-20s %s' %(tag, '(%s)' %(record['type']), value)
+
+    class DynamicEntry():
+        __slots__ = ('d_tag', 'd_val')
+
+        # Initializes a dynamic entry from its tag and its value (d_val and d_ptr share the same field)
+        def __init__(self, d_tag, d_val) -> None:
+            self.d_tag = d_tag
+            self.d_val = d_val
@@ -1,60 +1,240 @@
+from functools import cached_property
 from readelf_clone.elfHeader import *
 from readelf_clone.programHeader import *
 from readelf_clone.sectionHeader import *
 from readelf_clone.symbolTable import *
+from readelf_clone.elfData import ElfData
+from readelf_clone.stringTable import StringTable
+from readelf_clone.symbolIndex import SymbolIndex
+from readelf_clone.dynamicSection import DynamicSection, SHT_DYNAMIC
+from readelf_clone.notes import Notes
+from readelf_clone.relocations import Relocations
+from readelf_clone.segmentIndex import SegmentIndex
+from readelf_clone.segmentMapping import SegmentMapping
+from readelf_clone.symbolHash import SymbolHash, SHT_GNU_HASH, SHT_HASH, SHN_UNDEF
+from readelf_clone.parseStats import measurePhase
+
+SHT_SYMTAB = 2
+SHT_DYNSYM = 11
 
 class Elf:
-    def __init__(self, elf) -> None:
-        self.header = Header(elf)
-        self.programHeader = ProgramHeader( 
-            elf, 
+    # Maps the file and decodes the header. Every other component is parsed the first time it is accessed and then kept.
+    # When a ParseCache is given, the headers stored by an earlier run for the same file are restored instead of decoded.
+    # Only the ELF header, program headers and section headers go through the cache: they are small and fixed in size,
+    # while the symbol tables are decoded lazily straight from the mapped file, which is cheaper than any stored copy.
+    # When a ParseStats is given, the reads and the time spent in each phase of parsing are counted in it (Elf.stats).
+    def __init__(self, elf, cache=None, stats=None) -> None:
+        self.stats = stats
+        with measurePhase(stats, 'Elf.data'):
+            elf = ElfData(elf, stats)
+        self.data = elf
+        self.stringTables = {}
+        self.cache = cache
+        self.cacheKey = cache.getKey(elf) if cache is not None else None
+        self.header = self.loadComponent('header', lambda: Header(elf), Header.fromSnapshot)
+
+    # Returns a header component restored from the parse cache, or parses it and stores it there for the next run
+    def loadComponent(self, name, parse, restore):
+        with measurePhase(self.stats, 'Elf.' + name):
+            if self.cacheKey is None:
+                return parse()
+            try:
+                snapshot = self.cache.load(self.cacheKey, name)
+            except KeyError:
+                component = parse()
+                self.cache.store(self.cacheKey, name, component.getSnapshot())
+                return component
+            with measurePhase(self.stats, 'Elf.' + name + ' (from cache)'):
+                return restore(snapshot)
+
+    @cached_property
+    def programHeader(self):
+        return self.loadComponent('programHeader', lambda: ProgramHeader( 
+            self.data, 
             self.header.getArchitecture(), 
+            self.header.getDataEncoding(),
             self.header.getProgramHeaderOffset(), 
-            self.header.getProgramHeaderNumber()
-        )
-        self.sectionHeader = SectionHeader( 
-            elf, 
+            self.header.getProgramHeaderNumber(),
+            self.header.getProgramHeaderSize()
+        ), ProgramHeader.fromSnapshot)
+
+    # The PT_LOAD segments sorted by virtual address, built the first time an address is translated
+    @cached_property
+    def segmentIndex(self):
+        return SegmentIndex(self.data, self.programHeader.entries)
+
+    # Returns the file offset holding the byte loaded at addr, or None when no file byte is loaded there
+    def vaddr_to_offset(self, addr):
+        return self.segmentIndex.vaddr_to_offset(addr)
+
+    # Returns the file offset (or None) of every address, in the order given
+    def vaddrs_to_offsets(self, addrs):
+        return self.segmentIndex.vaddrs_to_offsets(addrs)
+
+    # Returns the size bytes loaded at addr, zero-filled past the end of the file backed part of the segment
+    def read_at_vaddr(self, addr, size):
+        return self.segmentIndex.read_at_vaddr(addr, size)
+
+    @cached_property
+    def sectionHeader(self):
+        sectionHeader = self.loadComponent('sectionHeader', lambda: SectionHeader( 
+            self.data, 
             self.header.getArchitecture(), 
+            self.header.getDataEncoding(),
             self.header.getSectionHeaderOffset(), 
             self.header.getSectionHeaderSize(), 
             self.header.getSectionHeaderNumber(),
             self.header.getStringTableIndex()
-        )
-        if self.sectionHeader.indexSYMTAB != -1:
-            self.symbolTable = SymbolTable(
-                elf,
+        ), SectionHeader.fromSnapshot)
+        # Shares the section header string table with the symbol tables that name SECTION symbols
+        if sectionHeader.stringTable is not None:
+            self.stringTables[self.header.getStringTableIndex()] = sectionHeader.stringTable
+        return sectionHeader
+
+    # The sections held by every segment, worked out with one sweep over the sections and segments sorted by where they start
+    @cached_property
+    def segmentMapping(self):
+        return SegmentMapping(self.programHeader.entries, self.sectionHeader.entries, self.sectionHeader.names)
+
+    # Returns the names of the sections held by the segment at index, in section header order
+    def sections_in_segment(self, index):
+        return [self.sectionHeader.names[section] for section in self.segmentMapping.getSections(index)]
+
+    # Returns the section header entry of the section called name, or None when there is none
+    def get_section(self, name):
+        return self.sectionHeader.get_section(name)
+
+    # Returns the indexes of every section of the given sh_type, in table order
+    def sections_of_type(self, sh_type):
+        return self.sectionHeader.sections_of_type(sh_type)
+
+    # The symbol table, or None when the file has no .symtab
+    @cached_property
+    def symbolTable(self):
+        if self.sectionHeader.indexSYMTAB == -1:
+            return None
+        with measurePhase(self.stats, 'Elf.symbolTable'):
+            return SymbolTable(
+                self.data,
                 self.header.getArchitecture(),
+                self.header.getDataEncoding(),
                 self.sectionHeader.entries,
                 self.sectionHeader.indexSYMTAB,
-                self.sectionHeader.indexSTRTAB,
-                self.header.getStringTableIndex(),
-                self.header.getSectionHeaderSize()
+                self.getStringTable(self.sectionHeader.indexSTRTAB),
+                self.getStringTable(self.header.getStringTableIndex())
             )
-        else:
-            print('There is no symbol table')
-        if self.sectionHeader.indexDYNSYM != -1:
-            self.dynamicSymbolTable = SymbolTable(
-                elf,
+
+    # The dynamic symbol table, or None when the file has no .dynsym
+    @cached_property
+    def dynamicSymbolTable(self):
+        if self.sectionHeader.indexDYNSYM == -1:
+            return None
+        with measurePhase(self.stats, 'Elf.dynamicSymbolTable'):
+            return SymbolTable(
+                self.data,
                 self.header.getArchitecture(),
+                self.header.getDataEncoding(),
                 self.sectionHeader.entries,
                 self.sectionHeader.indexDYNSYM,
-                self.sectionHeader.indexDYNSTR,
-                self.header.getStringTableIndex(),
-                self.header.getSectionHeaderSize()
+                self.getStringTable(self.sectionHeader.indexDYNSTR),
+                self.getStringTable(self.header.getStringTableIndex())
             )
-        else:
-            print('There is no dynamic symbol table')
-
-
 
+    # The .dynamic section, or None when the file has none (static executables and relocatable objects)
+    @cached_property
+    def dynamicSection(self):
+        sections = self.sections_of_type(SHT_DYNAMIC)
+        if not sections:
+            return None
+        section = self.sectionHeader.entries[sections[0]]
+        return DynamicSection(
+            self.data,
+            self.header.getArchitecture(),
+            self.header.getDataEncoding(),
+            section,
+            self.getStringTable(section.sh_link)
+        )
 
+    # Every entry of the REL and RELA sections with its symbol resolved, or None when the file has no relocation sections
+    @cached_property
+    def relocations(self):
+        relocations = Relocations(
+            self.data,
+            self.header.getArchitecture(),
+            self.header.getDataEncoding(),
+            self.header.e_machine,
+            self.sectionHeader.entries,
+            self.sectionHeader.names,
+            self.getSymbolTable
+        )
+        return relocations if relocations.entries else None
 
+    # Returns the symbol table held in the section at index, sharing .symtab and .dynsym with the rest of the Elf
+    def getSymbolTable(self, index):
+        if index == self.sectionHeader.indexSYMTAB:
+            return self.symbolTable
+        if index == self.sectionHeader.indexDYNSYM:
+            return self.dynamicSymbolTable
+        section = self.sectionHeader.entries[index] if index < len(self.sectionHeader.entries) else None
+        if section is None or section.sh_type not in (SHT_SYMTAB, SHT_DYNSYM):
+            return None
+        return SymbolTable(
+            self.data,
+            self.header.getArchitecture(),
+            self.header.getDataEncoding(),
+            self.sectionHeader.entries,
+            index,
+            self.getStringTable(section.sh_link),
+            self.getStringTable(self.header.getStringTableIndex())
+        )
 
+    # Every note of the file, from its note segments or else its note sections, or None when the file has no notes
+    @cached_property
+    def notes(self):
+        notes = Notes(
+            self.data,
+            self.header.getArchitecture(),
+            self.header.getDataEncoding(),
+            self.programHeader.entries,
+            self.sectionHeader.entries
+        )
+        return notes if notes.entries else None
 
-                
-            
+    # Address and name lookups merged across .symtab and .dynsym, built the first time it is used
+    @cached_property
+    def symbolIndex(self):
+        return SymbolIndex([self.symbolTable, self.dynamicSymbolTable])
 
+    # The .gnu.hash (preferred) or .hash table of .dynsym, or None when the file has neither
+    @cached_property
+    def dynamicSymbolHash(self):
+        if self.dynamicSymbolTable is None:
+            return None
+        for sh_type in (SHT_GNU_HASH, SHT_HASH):
+            for index in self.sections_of_type(sh_type):
+                section = self.sectionHeader.entries[index]
+                if section.sh_link == self.sectionHeader.indexDYNSYM:
+                    return SymbolHash(self.data, self.header.getArchitecture(), self.header.getDataEncoding(), section, self.dynamicSymbolTable)
+        return None
 
-        
+    # Returns the defined .dynsym entry called name, or None when the file does not export it.
+    # Goes through the hash table when there is one, otherwise searches .dynsym from the start.
+    def lookup_dynamic(self, name):
+        if self.dynamicSymbolHash is not None:
+            return self.dynamicSymbolHash.lookup_dynamic(name)
+        if self.dynamicSymbolTable is None:
+            return None
+        for entry in self.dynamicSymbolTable.entries:
+            if entry.st_shndx != SHN_UNDEF and entry.st_converted_name == name:
+                return entry
+        return None
 
+    # Returns the string table held in the section at index, locating it the first time it is asked for so every table using it shares one copy
+    def getStringTable(self, index):
+        if index not in self.stringTables:
+            self.stringTables[index] = StringTable(self.data, self.sectionHeader.entries[index])
+        return self.stringTables[index]
 
+    # Releases the memory map backing the parsers
+    def close(self):
+        self.data.close()
@@ -0,0 +1,54 @@
+import io
+import mmap
+
+class ElfData():
+    # Wraps the opened ELF file in a read-only memory map so every parser can decode straight from slices of it.
+    # Inputs that cannot be mapped (pipes, sockets, in-memory streams, empty files) are read once into a bytes
+    # object instead, so the parsers see the same buffer interface either way.
+    # stats is an optional ParseStats every read is counted in.
+    # Source:
+    #    https://docs.python.org/3/library/mmap.html
+    #    https://docs.python.org/3/library/stdtypes.html#memoryview
+    def __init__(self, elf, stats=None) -> None:
+        self.elf = elf
+        self.stats = stats
+        self.mapping = None
+        try:
+            self.mapping = mmap.mmap(elf.fileno(), 0, access=mmap.ACCESS_READ)
+            self.source = self.mapping
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            # Falls back to the file object for anything mmap refuses
+            self.source = elf.read()
+            if stats is not None:
+                stats.countRead(0, len(self.source))
+        self.buffer = memoryview(self.source)
+        self.size = len(self.buffer)
+
+    # Returns a zero-copy view of size bytes starting at offset
+    def view(self, offset, size):
+        if offset < 0 or size < 0 or offset + size > self.size:
+            raise Exception('Read of %d bytes at offset %d is outside of the ELF file' %(size, offset))
+        if self.stats is not None:
+            self.stats.countRead(offset, size)
+        return self.buffer[offset:offset + size]
+
+    # Returns the NUL terminated string starting at offset, searching no further than end
+    def cstring(self, offset, end=None):
+        if end is None or end > self.size:
+            end = self.size
+        terminator = self.source.find(b"\x00", offset, end)
+        if terminator == -1:
+            terminator = end
+        if self.stats is not None:
+            self.stats.countRead(offset, min(terminator + 1, end) - offset)
+        return bytes(self.buffer[offset:terminator]).decode(errors='replace')
+
+    # Unmaps the file. Views still held by callers keep the mapping alive, in which case it is left to the garbage collector.
+    def close(self):
+        if self.mapping is None:
+            return
+        self.buffer.release()
+        try:
+            self.mapping.close()
+        except BufferError:
+            pass
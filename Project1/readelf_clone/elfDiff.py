@@ -0,0 +1,136 @@
+from readelf_clone.elf import Elf
+from readelf_clone.lookupDictionary.lookupDictionary import shDictionary, stDictionary
+from readelf_clone.renderers import TextRenderer
+import sys
+
+# Symbol types left out of the diff since every build has them: SECTION and FILE
+SKIPPED_SYMBOL_TYPES = {3, 4}
+
+# Returns the items keyed by (name, occurrence), so the n-th item with a name in one file is compared with the n-th
+# item with the same name in the other. Names repeat for local symbols of different objects and for some sections.
+def keyByName(items):
+    keyed = {}
+    occurrences = {}
+    for name, item in items:
+        occurrence = occurrences.get(name, 0)
+        occurrences[name] = occurrence + 1
+        keyed[(name, occurrence)] = item
+    return keyed
+
+class ElfDiff():
+    # Compares the section headers and the symbol tables of two files. Each table is decoded once into a dictionary keyed
+    # by name and each key is looked up in the other file's dictionary, so the diff is linear in the size of the tables.
+    # Differences are listed in the order the sections and symbols appear in their file.
+    # Sections are reported as added, removed or changed (size, type or flags differ), symbols as added, removed or
+    # resized. Addresses are not compared, since nearly every symbol moves between two builds.
+    def __init__(self, old, new) -> None:
+        self.old = old
+        self.new = new
+        self.sections = self.diffSections()
+        self.symbols = self.diffSymbols('.symtab', old.symbolTable, new.symbolTable) + self.diffSymbols('.dynsym', old.dynamicSymbolTable, new.dynamicSymbolTable)
+
+    # Returns the section header entries of a file keyed by (name, occurrence)
+    def keySections(self, elf):
+        return keyByName(zip(elf.sectionHeader.names, elf.sectionHeader.entries))
+
+    # Returns the symbol entries of a table keyed by (name, occurrence), leaving out the null, section and file symbols
+    def keySymbols(self, symbolTable):
+        if symbolTable is None:
+            return {}
+        return keyByName((entry.st_converted_name, entry) for index, entry in enumerate(symbolTable.entries) if index and entry.st_type not in SKIPPED_SYMBOL_TYPES)
+
+    # Returns the sections added to, changed in and removed from the new file
+    def diffSections(self):
+        old = self.keySections(self.old)
+        new = self.keySections(self.new)
+        records = []
+        for key, after in new.items():
+            before = old.get(key)
+            if before is None:
+                records.append(self.createRecord('section', 'added', 'sections', key, None, after.sh_size, after.sh_type))
+            elif before.sh_size != after.sh_size or before.sh_type != after.sh_type or before.sh_flags != after.sh_flags:
+                records.append(self.createRecord('section', 'changed', 'sections', key, before.sh_size, after.sh_size, after.sh_type))
+        for key, before in old.items():
+            if key not in new:
+                records.append(self.createRecord('section', 'removed', 'sections', key, before.sh_size, None, before.sh_type))
+        return records
+
+    # Returns the symbols of one table added to, resized in and removed from the new file
+    def diffSymbols(self, source, oldTable, newTable):
+        old = self.keySymbols(oldTable)
+        new = self.keySymbols(newTable)
+        records = []
+        for key, after in new.items():
+            before = old.get(key)
+            if before is None:
+                records.append(self.createRecord('symbol', 'added', source, key, None, after.st_size, after.st_type))
+            elif before.st_size != after.st_size:
+                records.append(self.createRecord('symbol', 'resized', source, key, before.st_size, after.st_size, after.st_type))
+        for key, before in old.items():
+            if key not in new:
+                records.append(self.createRecord('symbol', 'removed', source, key, before.st_size, None, before.st_type))
+        return records
+
+    # Returns one difference as a record, with the size change (a missing side counts as size 0)
+    def createRecord(self, kind, change, source, key, oldSize, newSize, typeValue):
+        if kind == 'section':
+            typeName = shDictionary['Type'].get(typeValue, 'Unknown')
+        else:
+            typeName = stDictionary['stType'].get(typeValue, 'Unknown')
+        return {
+            'kind': kind,
+            'change': change,
+            'source': source,
+            'name': key[0],
+            'type': typeName,
+            'oldSize': oldSize,
+            'newSize': newSize,
+            'delta': (newSize or 0) - (oldSize or 0),
+        }
+
+    # Returns the number of each kind of change and the total change in size of the sections and of the symbols
+    def getSummary(self):
+        summary = {}
+        for record in self.sections + self.symbols:
+            name = '%s %s' %(record['kind'], record['change'])
+            summary[name] = summary.get(name, 0) + 1
+        summary['section size delta'] = sum(record['delta'] for record in self.sections)
+        summary['symbol size delta'] = sum(record['delta'] for record in self.symbols)
+        return summary
+
+    recordFields = ('kind', 'change', 'source', 'name', 'type', 'oldSize', 'newSize', 'delta')
+    textHeading = '\t%-8s %-8s %-15s %-40s %-10s %-10s %-10s %s' %('Kind', 'Change', 'Source', 'Name', 'Type', 'Old size', 'New size', 'Delta')
+
+    # Prints every difference in a similar format to the other tables
+    def getDiff(self):
+        TextRenderer(sys.stdout).render('diff', self)
+
+    # Yields the section differences then the symbol differences
+    def iterRecords(self):
+        yield from (dict(record) for record in self.sections)
+        yield from (dict(record) for record in self.symbols)
+
+    # Returns the text table line for one record
+    def formatText(self, record):
+        return ('\t%-8s %-8s %-15s %-40s %-10s %-10s %-10s %+d'
+                %(
+                    record['kind'],
+                    record['change'],
+                    record['source'],
+                    record['name'],
+                    record['type'],
+                    '-' if record['oldSize'] is None else record['oldSize'],
+                    '-' if record['newSize'] is None else record['newSize'],
+                    record['delta']
+                ))
+
+# Opens and compares the files at oldPath and newPath
+def diffFiles(oldPath, newPath, cache=None):
+    with open(oldPath, 'rb') as oldFile, open(newPath, 'rb') as newFile:
+        old = Elf(oldFile, cache)
+        new = Elf(newFile, cache)
+        try:
+            return ElfDiff(old, new)
+        finally:
+            old.close()
+            new.close()
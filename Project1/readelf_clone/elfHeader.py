@@ -1,83 +1,122 @@
-import struct
 from readelf_clone.lookupDictionary.lookupDictionary import hDictionary
-BYTE = 1
-HALFWORD = 2
-WORD = 4
-DOUBLEWORD = 8
+from readelf_clone.elfStructs import IDENT, getStruct
+from readelf_clone.renderers import TextRenderer
+import sys
 
 class Header:
-    # Initializes the header object and unpacks the bytes sequentially with the corresponding size from documention.
+    # Initializes the header object and unpacks the bytes with the layout from documention matching the class and byte order in e_ident.
     # Source: 
     #    https://refspecs.linuxbase.org/elf/gabi4+/
     #    https://wiki.osdev.org/ELF_Tutorial
     #    https://en.wikipedia.org/wiki/Executable_and_Linkable_Format
     #    https://man7.org/linux/man-pages/man5/elf.5.html
     def __init__(self, elf) -> None:
+        ident = IDENT.unpack_from(elf.view(0, IDENT.size))
         self.e_ident = {
-            'ei_mag0': struct.unpack('B', elf.read(BYTE))[0],
-            'ei_mag1': struct.unpack('B', elf.read(BYTE))[0],
-            'ei_mag2':	struct.unpack('B', elf.read(BYTE))[0],
-            'ei_mag3':	struct.unpack('B', elf.read(BYTE))[0],
-            'ei_class': struct.unpack('B', elf.read(BYTE))[0],
-            'ei_data': struct.unpack('B', elf.read(BYTE))[0],
-            'ei_version': struct.unpack('B', elf.read(BYTE))[0],
-            'ei_osabi': struct.unpack('B', elf.read(BYTE))[0],	
-            'ei_abiversion': struct.unpack('B', elf.read(BYTE))[0],
-            'ei_pad': struct.unpack('7B', elf.read(7))[0],
+            'ei_mag0': ident[0],
+            'ei_mag1': ident[1],
+            'ei_mag2':	ident[2],
+            'ei_mag3':	ident[3],
+            'ei_class': ident[4],
+            'ei_data': ident[5],
+            'ei_version': ident[6],
+            'ei_osabi': ident[7],	
+            'ei_abiversion': ident[8],
+            'ei_pad': ident[9],
         }
-        self.e_type = struct.unpack('H', elf.read(HALFWORD))[0]
-        self.e_machine = struct.unpack('H', elf.read(HALFWORD))[0]
-        self.e_version = struct.unpack('I', elf.read(WORD))[0]
-       
-        if self.e_ident["ei_class"] == 2:
-            self.e_entry= struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-            self.e_phoff= struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-            self.e_shoff= struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-        else: 
-            self.e_entry= struct.unpack('I', elf.read(WORD))[0]
-            self.e_phoff= struct.unpack('I', elf.read(WORD))[0]
-            self.e_shoff= struct.unpack('I', elf.read(WORD))[0]
-
-        self.e_flags= struct.unpack('I', elf.read(WORD))[0]
-        self.e_ehsize= struct.unpack('H', elf.read(HALFWORD))[0]
-        self.e_phentsize= struct.unpack('H', elf.read(HALFWORD))[0]
-        self.e_phnum= struct.unpack('H', elf.read(HALFWORD))[0]
-        self.e_shentsize= struct.unpack('H', elf.read(HALFWORD))[0]
-        self.e_shnum = struct.unpack('H', elf.read(HALFWORD))[0]
-        self.e_shstrndx= struct.unpack('H', elf.read(HALFWORD))[0]
 
         # Raises and exception and exits if the file is not an ELF
         identifier = format(self.e_ident['ei_mag0'], 'x') + format(self.e_ident['ei_mag1'], 'x') + format(self.e_ident['ei_mag2'], 'x') + format(self.e_ident['ei_mag3'], 'x')
         if identifier != '7f454c46':
             raise Exception('This is not an ELF file')
+
+        layout = getStruct('Header', self.e_ident['ei_class'], self.e_ident['ei_data'])
+        (
+            self.e_type,
+            self.e_machine,
+            self.e_version,
+            self.e_entry,
+            self.e_phoff,
+            self.e_shoff,
+            self.e_flags,
+            self.e_ehsize,
+            self.e_phentsize,
+            self.e_phnum,
+            self.e_shentsize,
+            self.e_shnum,
+            self.e_shstrndx,
+        ) = layout.unpack_from(elf.view(IDENT.size, layout.size))
     
+    # Rebuilds a header from the fields stored by getSnapshot without decoding the file
+    @classmethod
+    def fromSnapshot(cls, snapshot):
+        header = cls.__new__(cls)
+        header.__dict__.update(snapshot)
+        return header
+
+    # Returns the decoded fields in a form that can be stored in the parse cache
+    def getSnapshot(self):
+        return dict(vars(self))
+
+    recordFields = (
+        'magic', 'ei_class', 'ei_data', 'ei_version', 'ei_osabi', 'ei_abiversion', 'e_type', 'e_machine', 'e_version',
+        'e_entry', 'e_phoff', 'e_shoff', 'e_flags', 'e_ehsize', 'e_phentsize', 'e_phnum', 'e_shentsize', 'e_shnum', 'e_shstrndx',
+    )
+    textHeading = None
+
     # Prints the stored attributes in the header object and returns them in a similar format to the readelf command.
-    # Source: Visually inspecting readelf results
     def getHeader(self):
-        outputDict = {
-            "Magic: ": self.getMagic(),
-            "Class: ": str(self.safeget('Class', self.e_ident['ei_class'])),
-            "Data: ": str(self.safeget('Data', self.e_ident['ei_data'])),
-            "Version: ": str(self.safeget('Version', self.e_ident['ei_version'])),
-            "OS/ABI: ": str(self.safeget('OS/ABI', self.e_ident['ei_osabi'])),
-            "ABI Version: ": str(self.e_ident['ei_abiversion']),
-            "Type: ": str(self.safeget('Type', self.e_type)),
-            "Machine: ": str(self.safeget('Machine', self.e_machine)),
-            "Version: ": str(self.e_version),
-            "Entry Point: ": str(hex(self.e_entry)),
-            "Entry Point For Program Headers: ": str(self.e_phoff),
-            "Entry Point For Section Headers: ": str(self.e_shoff),
-            "Flags: ": str(hex(self.e_flags)),
-            "Size Of Header: ": str(self.e_ehsize),
-            "Size of Program Headers: ": str(self.e_phentsize),
-            "Number Of Program Headers: ": str(f"{self.e_phnum:02d}"),
-            "Size Of Section Headers: ": str(self.e_shentsize),
-            "Number of Section Headers: " : str(self.e_shnum),
-            "Section Header String Table Index: ": str(self.e_shstrndx),
+        TextRenderer(sys.stdout).render('header', self)
+
+    # Yields the header as a single record with the named fields converted to their names
+    def iterRecords(self):
+        yield {
+            'magic': self.getMagic(),
+            'ei_class': self.safeget('Class', self.e_ident['ei_class']),
+            'ei_data': self.safeget('Data', self.e_ident['ei_data']),
+            'ei_version': self.safeget('Version', self.e_ident['ei_version']),
+            'ei_osabi': self.safeget('OS/ABI', self.e_ident['ei_osabi']),
+            'ei_abiversion': self.e_ident['ei_abiversion'],
+            'e_type': self.safeget('Type', self.e_type),
+            'e_machine': self.safeget('Machine', self.e_machine),
+            'e_version': self.e_version,
+            'e_entry': self.e_entry,
+            'e_phoff': self.e_phoff,
+            'e_shoff': self.e_shoff,
+            'e_flags': self.e_flags,
+            'e_ehsize': self.e_ehsize,
+            'e_phentsize': self.e_phentsize,
+            'e_phnum': self.e_phnum,
+            'e_shentsize': self.e_shentsize,
+            'e_shnum': self.e_shnum,
+            'e_shstrndx': self.e_shstrndx,
         }
 
-        for key,value in outputDict.items():
-            print('\t%-36s %-30s' %(key, value))
+    # Returns the header lines for the text table
+    # Source: Visually inspecting readelf results
+    def formatText(self, record):
+        outputDict = {
+            "Magic: ": record['magic'],
+            "Class: ": str(record['ei_class']),
+            "Data: ": str(record['ei_data']),
+            "Version: ": str(record['ei_version']),
+            "OS/ABI: ": str(record['ei_osabi']),
+            "ABI Version: ": str(record['ei_abiversion']),
+            "Type: ": str(record['e_type']),
+            "Machine: ": str(record['e_machine']),
+            "Version: ": str(record['e_version']),
+            "Entry Point: ": str(hex(record['e_entry'])),
+            "Entry Point For Program Headers: ": str(record['e_phoff']),
+            "Entry Point For Section Headers: ": str(record['e_shoff']),
+            "Flags: ": str(hex(record['e_flags'])),
+            "Size Of Header: ": str(record['e_ehsize']),
+            "Size of Program Headers: ": str(record['e_phentsize']),
+            "Number Of Program Headers: ": str(f"{record['e_phnum']:02d}"),
+            "Size Of Section Headers: ": str(record['e_shentsize']),
+            "Number of Section Headers: " : str(record['e_shnum']),
+            "Section Header String Table Index: ": str(record['e_shstrndx']),
+        }
+        return '\n'.join('\t%-36s %-30s' %(key, value) for key, value in outputDict.items())
             
     # Matches the valueKey (typically an attibute of the object) with the corresponding key in the corresponding dictionary
     def safeget(self, attributeKey, valueKey):
@@ -114,5 +153,8 @@ class Header:
     def getArchitecture(self):
         return self.e_ident['ei_class']
 
+    def getDataEncoding(self):
+        return self.e_ident['ei_data']
+
     def getStringTableIndex(self):
         return self.e_shstrndx
\ No newline at end of file
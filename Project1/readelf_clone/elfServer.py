@@ -0,0 +1,140 @@
+import io
+import os
+import json
+import base64
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from readelf_clone import batchScan
+from readelf_clone.batchScan import initWorker
+from readelf_clone.elf import Elf
+from readelf_clone.parseCache import fileIdentity
+from readelf_clone.renderers import createRenderer, renderTables, renderers
+from readelf_clone.symbolQuery import createTransform
+from readelf_clone.serverProtocol import MESSAGE_LIMIT, defaultSocketPath, encodeMessage, decodeMessage
+
+# Renders the selected tables of one file, given by path or as the bytes of an uploaded file, inside a worker process.
+# query is the symbol filter of the request (see symbolQuery.getQueryOptions), or None to list every symbol.
+def renderSource(path, data, tables, outputFormat, query=None):
+    transform = createTransform(query)
+    output = io.StringIO()
+    renderer = createRenderer(outputFormat, output)
+    with (open(path, 'rb') if data is None else io.BytesIO(data)) as elfFile:
+        # Only files on disk have an identity the parse cache can key them by
+        elf = Elf(elfFile, batchScan.workerCache if data is None else None)
+        try:
+            renderTables(elf, renderer, set(tables) if tables is not None else None, transform)
+        finally:
+            elf.close()
+    batchScan.flushWorkerCache()
+    return output.getvalue()
+
+class ElfServer():
+    # A long running server that renders files for clients so they skip interpreter startup and imports.
+    # It listens on a Unix socket (or on localhost TCP when a port is given) with asyncio, and every request is one line
+    # of JSON naming a path or carrying the base64 bytes of a file, the tables wanted (main.py option names, or null for
+    # all of them), the output format and optionally the symbol filter, sort and top-N under 'symbols'. The reply is one line of JSON with the rendered output or the error.
+    # Parsing runs in a pool of worker processes. The output of the last cacheEntries requests is kept in an LRU keyed
+    # by the identity of the file (device, inode, size, mtime, or the SHA-256 of uploaded bytes), the tables, the format and the symbol query,
+    # and identical requests arriving while one is being parsed wait for the same result.
+    # The Unix socket is only reachable by its owner. Any local user can connect over TCP, so a TCP server only reads
+    # paths inside root and without a root only takes uploaded files. A root limits path requests on a socket too.
+    # Source: https://docs.python.org/3/library/asyncio-stream.html
+    def __init__(self, socketPath=None, port=None, workers=None, cacheEntries=256, cacheOptions=None, root=None) -> None:
+        self.socketPath = socketPath or defaultSocketPath()
+        self.port = port
+        self.root = os.path.realpath(root) if root is not None else None
+        self.workers = workers or os.cpu_count() or 1
+        self.cacheEntries = cacheEntries
+        self.cacheOptions = cacheOptions
+        self.results = OrderedDict()
+        self.pending = {}
+        self.executor = None
+
+    # Serves until interrupted, then stops the workers and removes the socket
+    def run(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=initWorker, initargs=(self.cacheOptions,))
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.executor.shutdown()
+            if self.port is None and os.path.exists(self.socketPath):
+                os.unlink(self.socketPath)
+
+    async def serve(self):
+        if self.port is not None:
+            server = await asyncio.start_server(self.handleConnection, '127.0.0.1', self.port, limit=MESSAGE_LIMIT)
+        else:
+            # A socket left behind by a server that did not shut down cleanly would make binding fail
+            if os.path.exists(self.socketPath):
+                os.unlink(self.socketPath)
+            # The socket is created owner-only rather than changed after binding, so it is never reachable by others
+            umask = os.umask(0o077)
+            try:
+                server = await asyncio.start_unix_server(self.handleConnection, self.socketPath, limit=MESSAGE_LIMIT)
+            finally:
+                os.umask(umask)
+        async with server:
+            await server.serve_forever()
+
+    # Answers every request sent on one connection in order until the client closes it
+    async def handleConnection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.handleRequest(decodeMessage(line))
+                except Exception as error:
+                    response = {'ok': False, 'error': str(error)}
+                writer.write(encodeMessage(response))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    # Returns the path a request may read, resolved inside root when there is one.
+    # Raises PermissionError for paths outside of root, and for every path on a TCP server without a root.
+    def checkPath(self, path):
+        if self.root is None:
+            if self.port is not None:
+                raise PermissionError('This server only displays uploaded files, send the file with --upload')
+            return path
+        resolved = os.path.realpath(path)
+        if os.path.commonpath([resolved, self.root]) != self.root:
+            raise PermissionError('%s is outside of %s, the directory this server reads from' %(path, self.root))
+        return resolved
+
+    # Returns the response to one request, from the LRU when the same file was rendered the same way recently
+    async def handleRequest(self, request):
+        tables = tuple(sorted(request['tables'])) if request.get('tables') is not None else None
+        outputFormat = request.get('format', 'text')
+        if outputFormat not in renderers:
+            raise Exception('Unknown output format %s' %(outputFormat))
+        if request.get('data') is not None:
+            path = None
+            data = base64.b64decode(request['data'])
+            identity = 'sha256:' + hashlib.sha256(data).hexdigest()
+        else:
+            path = self.checkPath(request['path'])
+            data = None
+            identity = fileIdentity(os.stat(path))
+        query = request.get('symbols')
+        key = (identity, tables, outputFormat, json.dumps(query, sort_keys=True))
+        if key in self.results:
+            self.results.move_to_end(key)
+            return {'ok': True, 'output': self.results[key], 'cached': True}
+
+        if key not in self.pending:
+            self.pending[key] = asyncio.get_running_loop().run_in_executor(self.executor, renderSource, path, data, tables, outputFormat, query)
+        try:
+            output = await self.pending[key]
+        finally:
+            self.pending.pop(key, None)
+        self.results[key] = output
+        while len(self.results) > self.cacheEntries:
+            self.results.popitem(last=False)
+        return {'ok': True, 'output': output, 'cached': False}
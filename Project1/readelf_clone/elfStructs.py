@@ -0,0 +1,91 @@
+import struct
+
+# The byte order prefix used by struct for each EI_DATA value
+# Source: https://docs.python.org/3/library/struct.html#byte-order-size-and-alignment
+byteOrder = {
+    1: '<',
+    2: '>',
+}
+
+# Field layouts of every record this program decodes, keyed by EI_CLASS. Everything after e_ident for the header.
+# Source:
+#    https://refspecs.linuxbase.org/elf/gabi4+/
+#    https://man7.org/linux/man-pages/man5/elf.5.html
+recordFormats = {
+    'Header': {
+        1: 'HHIIIIIHHHHHH',
+        2: 'HHIQQQIHHHHHH',
+    },
+    'ProgramHeader': {
+        1: 'IIIIIIII',
+        2: 'IIQQQQQQ',
+    },
+    'SectionHeader': {
+        1: 'IIIIIIIIII',
+        2: 'IIQQQQIIQQ',
+    },
+    'Symbol': {
+        1: 'IIIBBH',
+        2: 'IBBHQQ',
+    },
+    'Dynamic': {
+        1: 'iI',
+        2: 'qQ',
+    },
+    # r_offset and r_info of a relocation without an addend
+    'Rel': {
+        1: 'II',
+        2: 'QQ',
+    },
+    # r_offset, r_info and r_addend of a relocation with an addend
+    'Rela': {
+        1: 'IIi',
+        2: 'QQq',
+    },
+    # namesz, descsz and type of a note, 32 bit words in both classes
+    'NoteHeader': {
+        1: 'III',
+        2: 'III',
+    },
+    # One bucket, chain or header word of .hash and .gnu.hash, 32 bits in both classes
+    'HashWord': {
+        1: 'I',
+        2: 'I',
+    },
+    # One word of the .gnu.hash bloom filter, as wide as an address
+    'BloomWord': {
+        1: 'I',
+        2: 'Q',
+    },
+}
+
+# The e_ident array is only bytes so it is read the same way for every class and byte order
+IDENT = struct.Struct('16B')
+
+# Precompiled decoders for each record keyed by (EI_CLASS, EI_DATA)
+elfStructs = {
+    record: {
+        (ei_class, ei_data): struct.Struct(prefix + layout)
+        for ei_class, layout in layouts.items()
+        for ei_data, prefix in byteOrder.items()
+    }
+    for record, layouts in recordFormats.items()
+}
+
+# Returns the precompiled decoder for a record, raising if the class or byte order is not one ELF defines
+def getStruct(record, ei_class, ei_data):
+    try:
+        return elfStructs[record][(ei_class, ei_data)]
+    except KeyError:
+        raise Exception('Unsupported ELF class %s or data encoding %s' %(ei_class, ei_data))
+
+# Decodes count records of stride bytes each starting at offset, using one iter_unpack over the whole table when the stride matches the layout
+def unpackTable(elf, layout, offset, count, stride):
+    if count == 0:
+        return []
+    if stride == layout.size:
+        return layout.iter_unpack(elf.view(offset, count * stride))
+    if stride < layout.size:
+        raise Exception('Entry size %d is smaller than the %d byte record' %(stride, layout.size))
+    table = elf.view(offset, count * stride)
+    return (layout.unpack_from(table, index * stride) for index in range(count))
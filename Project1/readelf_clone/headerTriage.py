@@ -0,0 +1,78 @@
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from readelf_clone.batchScan import ELF_MAGIC, findFiles, chunked
+from readelf_clone.elfStructs import byteOrder
+
+# Bytes read from every file: the whole ELF64 header, which also covers the 52 byte ELF32 header
+TRIAGE_SIZE = 64
+# Size of the ELF header of each class, shorter files are truncated
+HEADER_SIZES = {
+    1: 52,
+    2: 64,
+}
+# Precompiled decoder of the fields triage reports, for each byte order: e_ident (magic, class, data encoding, version,
+# OS/ABI, ABI version and padding) followed by e_type and e_machine, which sit at the same offsets in both classes
+TRIAGE_STRUCTS = {ei_data: struct.Struct(prefix + '4sBBBBB7xHH') for ei_data, prefix in byteOrder.items()}
+
+# Classifies the file at path from its first 64 bytes, read with one pread and decoded with one unpack.
+# Returns {'path', 'class', 'data', 'osabi', 'type', 'machine'} with the numbers from the header (hDictionary names
+# them), a record with the reason the file was skipped, or a record with the error that stopped it being read.
+# Source: https://man7.org/linux/man-pages/man5/elf.5.html
+def triageFile(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as error:
+        return {'path': path, 'error': str(error)}
+    try:
+        data = os.pread(fd, TRIAGE_SIZE, 0)
+    except OSError as error:
+        return {'path': path, 'error': str(error)}
+    finally:
+        os.close(fd)
+    if data[:4] != ELF_MAGIC:
+        return {'path': path, 'skipped': 'not an ELF file'}
+    if len(data) < 6 or data[4] not in HEADER_SIZES:
+        return {'path': path, 'skipped': 'unsupported ELF class'}
+    if data[5] not in TRIAGE_STRUCTS:
+        return {'path': path, 'skipped': 'unsupported data encoding'}
+    if len(data) < HEADER_SIZES[data[4]]:
+        return {'path': path, 'skipped': 'truncated ELF header'}
+    _, ei_class, ei_data, _, ei_osabi, _, e_type, e_machine = TRIAGE_STRUCTS[data[5]].unpack_from(data)
+    return {
+        'path': path,
+        'class': ei_class,
+        'data': ei_data,
+        'osabi': ei_osabi,
+        'type': e_type,
+        'machine': e_machine,
+    }
+
+# Classifies a chunk of paths inside a worker thread
+def triageChunk(paths):
+    return [triageFile(path) for path in paths]
+
+# Classifies every file under the given paths and yields one record per file as chunks complete.
+# Only the header is read, so the work is waiting on the disk: a pool of threads keeps many reads in flight at once
+# (os.pread releases the GIL) while the paths are still being listed. Only a bounded number of chunks are queued so
+# huge trees are never held in memory. workers defaults to the ThreadPoolExecutor default, min(32, CPUs + 4).
+# Source: https://docs.python.org/3/library/os.html#os.pread
+def triageFiles(paths, workers=None, chunkSize=256, include=None, exclude=None):
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    chunks = chunked(findFiles(paths, include, exclude), chunkSize)
+    if workers == 1:
+        for chunk in chunks:
+            yield from triageChunk(chunk)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(triageChunk, chunk))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
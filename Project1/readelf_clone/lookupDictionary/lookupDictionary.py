@@ -367,4 +367,234 @@ stDictionary = {
         2: 'HIDDEN',
         3: 'PROTECTED',
     }
-}
\ No newline at end of file
+}
+
+dtDictionary = {
+    'Tag': {
+        0: 'NULL',
+        1: 'NEEDED',
+        2: 'PLTRELSZ',
+        3: 'PLTGOT',
+        4: 'HASH',
+        5: 'STRTAB',
+        6: 'SYMTAB',
+        7: 'RELA',
+        8: 'RELASZ',
+        9: 'RELAENT',
+        10: 'STRSZ',
+        11: 'SYMENT',
+        12: 'INIT',
+        13: 'FINI',
+        14: 'SONAME',
+        15: 'RPATH',
+        16: 'SYMBOLIC',
+        17: 'REL',
+        18: 'RELSZ',
+        19: 'RELENT',
+        20: 'PLTREL',
+        21: 'DEBUG',
+        22: 'TEXTREL',
+        23: 'JMPREL',
+        24: 'BIND_NOW',
+        25: 'INIT_ARRAY',
+        26: 'FINI_ARRAY',
+        27: 'INIT_ARRAYSZ',
+        28: 'FINI_ARRAYSZ',
+        29: 'RUNPATH',
+        30: 'FLAGS',
+        32: 'PREINIT_ARRAY',
+        33: 'PREINIT_ARRAYSZ',
+        34: 'SYMTAB_SHNDX',
+        1879047925: 'GNU_HASH',
+        1879048176: 'VERSYM',
+        1879048185: 'RELACOUNT',
+        1879048186: 'RELCOUNT',
+        1879048187: 'FLAGS_1',
+        1879048188: 'VERDEF',
+        1879048189: 'VERDEFNUM',
+        1879048190: 'VERNEED',
+        1879048191: 'VERNEEDNUM',
+    }
+}
+
+ntDictionary = {
+    'GNU': {
+        1: 'NT_GNU_ABI_TAG',
+        2: 'NT_GNU_HWCAP',
+        3: 'NT_GNU_BUILD_ID',
+        4: 'NT_GNU_GOLD_VERSION',
+        5: 'NT_GNU_PROPERTY_TYPE_0',
+    },
+    'CORE': {
+        1: 'NT_PRSTATUS',
+        2: 'NT_FPREGSET',
+        3: 'NT_PRPSINFO',
+        4: 'NT_TASKSTRUCT',
+        6: 'NT_AUXV',
+        1179208773: 'NT_FILE',
+        1397311305: 'NT_SIGINFO',
+    },
+    'NetBSD': {
+        1: 'NT_NETBSD_IDENT',
+        2: 'NT_NETBSD_EMULATION',
+        5: 'NT_NETBSD_MARCH',
+        6: 'NT_NETBSD_PAX',
+    },
+    # The operating system in the first word of NT_GNU_ABI_TAG
+    'ABI': {
+        0: 'Linux',
+        1: 'Hurd',
+        2: 'Solaris',
+        3: 'FreeBSD',
+    },
+}
+# Relocation type names, keyed by e_machine then by the type in r_info
+# Source:
+#    https://gitlab.com/x86-psABIs/x86-64-ABI
+#    https://github.com/ARM-software/abi-aa/blob/main/aaelf64/aaelf64.rst
+#    https://github.com/ARM-software/abi-aa/blob/main/aaelf32/aaelf32.rst
+#    https://man7.org/linux/man-pages/man5/elf.5.html
+rDictionary = {
+    # Intel 80386
+    3: {
+        0: 'R_386_NONE',
+        1: 'R_386_32',
+        2: 'R_386_PC32',
+        3: 'R_386_GOT32',
+        4: 'R_386_PLT32',
+        5: 'R_386_COPY',
+        6: 'R_386_GLOB_DAT',
+        7: 'R_386_JUMP_SLOT',
+        8: 'R_386_RELATIVE',
+        9: 'R_386_GOTOFF',
+        10: 'R_386_GOTPC',
+        11: 'R_386_32PLT',
+        14: 'R_386_TLS_TPOFF',
+        15: 'R_386_TLS_IE',
+        16: 'R_386_TLS_GOTIE',
+        17: 'R_386_TLS_LE',
+        18: 'R_386_TLS_GD',
+        19: 'R_386_TLS_LDM',
+        20: 'R_386_16',
+        21: 'R_386_PC16',
+        22: 'R_386_8',
+        23: 'R_386_PC8',
+        35: 'R_386_TLS_DTPMOD32',
+        36: 'R_386_TLS_DTPOFF32',
+        37: 'R_386_TLS_TPOFF32',
+        38: 'R_386_SIZE32',
+        39: 'R_386_TLS_GOTDESC',
+        40: 'R_386_TLS_DESC_CALL',
+        41: 'R_386_TLS_DESC',
+        42: 'R_386_IRELATIVE',
+        43: 'R_386_GOT32X',
+    },
+    # ARM
+    40: {
+        0: 'R_ARM_NONE',
+        2: 'R_ARM_ABS32',
+        3: 'R_ARM_REL32',
+        10: 'R_ARM_THM_CALL',
+        17: 'R_ARM_TLS_DTPMOD32',
+        18: 'R_ARM_TLS_DTPOFF32',
+        19: 'R_ARM_TLS_TPOFF32',
+        20: 'R_ARM_COPY',
+        21: 'R_ARM_GLOB_DAT',
+        22: 'R_ARM_JUMP_SLOT',
+        23: 'R_ARM_RELATIVE',
+        28: 'R_ARM_CALL',
+        29: 'R_ARM_JUMP24',
+        30: 'R_ARM_THM_JUMP24',
+        43: 'R_ARM_MOVW_ABS_NC',
+        44: 'R_ARM_MOVT_ABS',
+        47: 'R_ARM_THM_MOVW_ABS_NC',
+        48: 'R_ARM_THM_MOVT_ABS',
+        160: 'R_ARM_IRELATIVE',
+    },
+    # AMD x86-64, also used by x32 files (ELFCLASS32 with EM_X86_64)
+    62: {
+        0: 'R_X86_64_NONE',
+        1: 'R_X86_64_64',
+        2: 'R_X86_64_PC32',
+        3: 'R_X86_64_GOT32',
+        4: 'R_X86_64_PLT32',
+        5: 'R_X86_64_COPY',
+        6: 'R_X86_64_GLOB_DAT',
+        7: 'R_X86_64_JUMP_SLOT',
+        8: 'R_X86_64_RELATIVE',
+        9: 'R_X86_64_GOTPCREL',
+        10: 'R_X86_64_32',
+        11: 'R_X86_64_32S',
+        12: 'R_X86_64_16',
+        13: 'R_X86_64_PC16',
+        14: 'R_X86_64_8',
+        15: 'R_X86_64_PC8',
+        16: 'R_X86_64_DTPMOD64',
+        17: 'R_X86_64_DTPOFF64',
+        18: 'R_X86_64_TPOFF64',
+        19: 'R_X86_64_TLSGD',
+        20: 'R_X86_64_TLSLD',
+        21: 'R_X86_64_DTPOFF32',
+        22: 'R_X86_64_GOTTPOFF',
+        23: 'R_X86_64_TPOFF32',
+        24: 'R_X86_64_PC64',
+        25: 'R_X86_64_GOTOFF64',
+        26: 'R_X86_64_GOTPC32',
+        27: 'R_X86_64_GOT64',
+        28: 'R_X86_64_GOTPCREL64',
+        29: 'R_X86_64_GOTPC64',
+        30: 'R_X86_64_GOTPLT64',
+        31: 'R_X86_64_PLTOFF64',
+        32: 'R_X86_64_SIZE32',
+        33: 'R_X86_64_SIZE64',
+        34: 'R_X86_64_GOTPC32_TLSDESC',
+        35: 'R_X86_64_TLSDESC_CALL',
+        36: 'R_X86_64_TLSDESC',
+        37: 'R_X86_64_IRELATIVE',
+        38: 'R_X86_64_RELATIVE64',
+        41: 'R_X86_64_GOTPCRELX',
+        42: 'R_X86_64_REX_GOTPCRELX',
+    },
+    # AArch64
+    183: {
+        0: 'R_AARCH64_NONE',
+        257: 'R_AARCH64_ABS64',
+        258: 'R_AARCH64_ABS32',
+        259: 'R_AARCH64_ABS16',
+        260: 'R_AARCH64_PREL64',
+        261: 'R_AARCH64_PREL32',
+        262: 'R_AARCH64_PREL16',
+        263: 'R_AARCH64_MOVW_UABS_G0',
+        264: 'R_AARCH64_MOVW_UABS_G0_NC',
+        265: 'R_AARCH64_MOVW_UABS_G1',
+        266: 'R_AARCH64_MOVW_UABS_G1_NC',
+        267: 'R_AARCH64_MOVW_UABS_G2',
+        268: 'R_AARCH64_MOVW_UABS_G2_NC',
+        269: 'R_AARCH64_MOVW_UABS_G3',
+        274: 'R_AARCH64_LD_PREL_LO19',
+        275: 'R_AARCH64_ADR_PREL_LO21',
+        276: 'R_AARCH64_ADR_PREL_PG_HI21',
+        277: 'R_AARCH64_ADR_PREL_PG_HI21_NC',
+        278: 'R_AARCH64_ADD_ABS_LO12_NC',
+        279: 'R_AARCH64_LDST8_ABS_LO12_NC',
+        280: 'R_AARCH64_TSTBR14',
+        281: 'R_AARCH64_CONDBR19',
+        282: 'R_AARCH64_JUMP26',
+        283: 'R_AARCH64_CALL26',
+        284: 'R_AARCH64_LDST16_ABS_LO12_NC',
+        285: 'R_AARCH64_LDST32_ABS_LO12_NC',
+        286: 'R_AARCH64_LDST64_ABS_LO12_NC',
+        299: 'R_AARCH64_LDST128_ABS_LO12_NC',
+        311: 'R_AARCH64_ADR_GOT_PAGE',
+        312: 'R_AARCH64_LD64_GOT_LO12_NC',
+        1024: 'R_AARCH64_COPY',
+        1025: 'R_AARCH64_GLOB_DAT',
+        1026: 'R_AARCH64_JUMP_SLOT',
+        1027: 'R_AARCH64_RELATIVE',
+        1028: 'R_AARCH64_TLS_DTPMOD',
+        1029: 'R_AARCH64_TLS_DTPREL',
+        1030: 'R_AARCH64_TLS_TPREL',
+        1031: 'R_AARCH64_TLSDESC',
+        1032: 'R_AARCH64_IRELATIVE',
+    },
+}
@@ -0,0 +1,159 @@
+from readelf_clone.lookupDictionary.lookupDictionary import ntDictionary
+from readelf_clone.elfStructs import IDENT, byteOrder, getStruct
+from readelf_clone.programHeader import ProgramHeader
+from readelf_clone.sectionHeader import SectionHeader
+from readelf_clone.renderers import TextRenderer
+import struct
+import sys
+
+PT_NOTE = 4
+SHT_NOTE = 7
+NT_GNU_ABI_TAG = 1
+NT_GNU_BUILD_ID = 3
+ELF_MAGIC = b"\x7fELF"
+
+# Yields (owner, type, description) for every note in buffer. Names and descriptions are padded to align bytes,
+# which is 4 except for the 8 byte aligned notes (such as GNU properties) of 64-bit files.
+# Source:
+#    https://refspecs.linuxbase.org/elf/gabi4+/ch5.pheader.html#note_section
+#    https://man7.org/linux/man-pages/man5/elf.5.html
+def iterNotes(buffer, ei_class, ei_data, align=4):
+    layout = getStruct('NoteHeader', ei_class, ei_data)
+    align = 8 if align == 8 else 4
+    offset = 0
+    while offset + layout.size <= len(buffer):
+        namesz, descsz, n_type = layout.unpack_from(buffer, offset)
+        nameStart = offset + layout.size
+        descStart = nameStart + namesz
+        descStart += -descStart % align
+        descEnd = descStart + descsz
+        if descEnd > len(buffer):
+            return
+        owner = bytes(buffer[nameStart:nameStart + namesz]).rstrip(b"\x00").decode(errors='replace')
+        yield owner, n_type, bytes(buffer[descStart:descEnd])
+        offset = descEnd + (-descEnd % align)
+
+# Returns the description of the first GNU build ID note in buffer as hex, or None
+def findBuildId(buffer, ei_class, ei_data, align=4):
+    for owner, n_type, desc in iterNotes(buffer, ei_class, ei_data, align):
+        if owner == 'GNU' and n_type == NT_GNU_BUILD_ID:
+            return desc.hex()
+    return None
+
+# Returns size bytes read at offset, raising when the file ends first
+def readAt(elfFile, offset, size):
+    elfFile.seek(offset)
+    data = elfFile.read(size)
+    if len(data) != size:
+        raise Exception('Read of %d bytes at offset %d is outside of the ELF file' %(size, offset))
+    return data
+
+# Returns the GNU build ID of the file at path as hex, or None when it has none or is not an ELF file.
+# Only the ELF header, the program headers and the note segments are read, without mapping the file or building an Elf.
+# Files without a PT_NOTE segment (relocatable objects) fall back to the section headers and their SHT_NOTE sections.
+def readBuildId(path):
+    with open(path, 'rb') as elfFile:
+        ident = elfFile.read(IDENT.size)
+        if len(ident) != IDENT.size or ident[:4] != ELF_MAGIC:
+            return None
+        ei_class, ei_data = ident[4], ident[5]
+        header = getStruct('Header', ei_class, ei_data)
+        fields = header.unpack(readAt(elfFile, IDENT.size, header.size))
+        e_phoff, e_shoff, e_phentsize, e_phnum, e_shentsize, e_shnum = fields[4], fields[5], fields[8], fields[9], fields[10], fields[11]
+
+        layout = getStruct('ProgramHeader', ei_class, ei_data)
+        if e_phnum and e_phentsize >= layout.size:
+            table = readAt(elfFile, e_phoff, e_phnum * e_phentsize)
+            segments = [ProgramHeader.ProgramHeaderEntry(layout.unpack_from(table, index * e_phentsize), ei_class) for index in range(e_phnum)]
+            notes = [segment for segment in segments if segment.p_type == PT_NOTE]
+            if notes:
+                for segment in notes:
+                    buildId = findBuildId(readAt(elfFile, segment.p_offset, segment.p_filesz), ei_class, ei_data, segment.p_align)
+                    if buildId is not None:
+                        return buildId
+                return None
+
+        layout = getStruct('SectionHeader', ei_class, ei_data)
+        if e_shnum and e_shentsize >= layout.size:
+            table = readAt(elfFile, e_shoff, e_shnum * e_shentsize)
+            for index in range(e_shnum):
+                section = SectionHeader.SectionHeaderEntry(layout.unpack_from(table, index * e_shentsize))
+                if section.sh_type == SHT_NOTE:
+                    buildId = findBuildId(readAt(elfFile, section.sh_offset, section.sh_size), ei_class, ei_data, section.sh_addralign)
+                    if buildId is not None:
+                        return buildId
+    return None
+
+class Notes():
+    # Decodes every note of the file, from its PT_NOTE segments or, when it has none, its SHT_NOTE sections
+    def __init__(self, elf, ei_class, ei_data, programEntries, sectionEntries) -> None:
+        self.elf = elf
+        self.ei_class = ei_class
+        self.ei_data = ei_data
+        self.entries = self.createEntries(programEntries, sectionEntries)
+
+    # Creates the note entries of every note segment, or of every note section when there is no note segment
+    def createEntries(self, programEntries, sectionEntries):
+        regions = [(entry.p_offset, entry.p_filesz, entry.p_align) for entry in programEntries if entry.p_type == PT_NOTE]
+        if not regions:
+            regions = [(entry.sh_offset, entry.sh_size, entry.sh_addralign) for entry in sectionEntries if entry.sh_type == SHT_NOTE]
+        entries = []
+        for offset, size, align in regions:
+            for owner, n_type, desc in iterNotes(self.elf.view(offset, size), self.ei_class, self.ei_data, align):
+                entries.append(self.NoteEntry(owner, n_type, desc))
+        return entries
+
+    # Returns the GNU build ID as hex, or None when the file has none
+    def getBuildId(self):
+        for entry in self.entries:
+            if entry.owner == 'GNU' and entry.n_type == NT_GNU_BUILD_ID:
+                return entry.desc.hex()
+        return None
+
+    # Returns the name of a note type, which depends on the owner of the note
+    def getTypeName(self, owner, n_type):
+        try:
+            return ntDictionary[owner][n_type]
+        except KeyError:
+            return "Unknown (0x%x)" %(n_type)
+
+    # Returns a readable description of a note: the build ID in hex, the OS and ABI of an ABI tag, otherwise the raw bytes in hex
+    def describe(self, entry):
+        if entry.owner == 'GNU' and entry.n_type == NT_GNU_BUILD_ID:
+            return 'Build ID: ' + entry.desc.hex()
+        if entry.owner == 'GNU' and entry.n_type == NT_GNU_ABI_TAG and len(entry.desc) >= 16:
+            system, major, minor, subminor = struct.unpack_from(byteOrder[self.ei_data] + 'IIII', entry.desc)
+            return 'OS: %s, ABI: %d.%d.%d' %(ntDictionary['ABI'].get(system, 'Unknown'), major, minor, subminor)
+        return entry.desc.hex()
+
+    recordFields = ('owner', 'n_type', 'type', 'descsz', 'description')
+    textHeading = '\t%-20s %-10s %-25s %s' %('Owner', 'Data size', 'Type', 'Description')
+
+    # Iterates over the list of notes and returns the results from their respective fields.
+    def getNotes(self):
+        TextRenderer(sys.stdout).render('notes', self)
+
+    # Yields one record per note with its type named after its owner
+    def iterRecords(self):
+        for entry in self.entries:
+            yield {
+                'owner': entry.owner,
+                'n_type': entry.n_type,
+                'type': self.getTypeName(entry.owner, entry.n_type),
+                'descsz': len(entry.desc),
+                'description': self.describe(entry),
+            }
+
+    # Returns the text table line for one record
+    # Source: Visually inspecting readelf results
+    def formatText(self, record):
+        return '\t%-20s %-10s %-25s %s' %(record['owner'], "0x{:08x}".format(record['descsz']), record['type'], record['description'])
+
+    class NoteEntry():
+        __slots__ = ('owner', 'n_type', 'desc')
+
+        # Initializes a note from its owner name, type and description bytes
+        def __init__(self, owner, n_type, desc) -> None:
+            self.owner = owner
+            self.n_type = n_type
+            self.desc = desc
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import sys
+
+# Where the cache lives when no path is given, following the XDG base directory layout
+def defaultCachePath():
+    cacheHome = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cacheHome, 'readelf_clone', 'parse-cache.sqlite')
+
+# Returns the (device, inode, size, mtime) identity of a file from its os.stat result, which changes whenever the file is replaced or modified
+def fileIdentity(status):
+    return '%d:%d:%d:%d' %(status.st_dev, status.st_ino, status.st_size, status.st_mtime_ns)
+
+# Number of buffered writes after which the parse cache writes them all in one transaction
+FLUSH_WRITES = 256
+
+# Opens the parse cache with the given ParseCache arguments, or returns None (after a warning on stderr) when it cannot be
+# created or opened, for example in a read-only cache directory, so the caller runs uncached instead of failing
+def openCache(cacheOptions):
+    if cacheOptions is None:
+        return None
+    try:
+        return ParseCache(**cacheOptions)
+    except (OSError, sqlite3.Error) as error:
+        print('warning: running without the parse cache: %s' %(error), file=sys.stderr)
+        return None
+
+class ParseCache():
+    # Opens (creating if needed) a SQLite file that stores the decoded headers of ELF files between runs.
+    # Files are identified by (device, inode, size, mtime). With hashContents the identity is mapped to a SHA-256 of the
+    # file so identical files at different paths share one set of stored components.
+    # rebuild ignores everything stored so far and replaces it as files are parsed again.
+    # Lookups never write: new components, new file digests and access times are buffered and written together in one
+    # short transaction by flush(), which runs every FLUSH_WRITES writes and on close(). Long running callers that never
+    # close the cache (worker processes) flush it after each unit of work.
+    # Source: https://docs.python.org/3/library/sqlite3.html
+    def __init__(self, path=None, maxBytes=256 * 1024 * 1024, hashContents=False, rebuild=False) -> None:
+        self.path = path or defaultCachePath()
+        self.maxBytes = maxBytes
+        self.hashContents = hashContents
+        self.rebuild = rebuild
+        # The components stored for the last file looked up, keyed by name
+        self.prefetchedKey = None
+        self.prefetched = {}
+        # Writes waiting for the next flush: access times keyed by (digest, component), stored rows and file digests
+        self.accessed = {}
+        self.stored = {}
+        self.digests = {}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # In WAL mode a NORMAL sync only gives up the last transactions on power loss, never the consistency of the file
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS files (identity TEXT PRIMARY KEY, digest TEXT NOT NULL)')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS components ('
+            'digest TEXT NOT NULL, component TEXT NOT NULL, payload BLOB NOT NULL, size INTEGER NOT NULL, lastUsed REAL NOT NULL, '
+            'PRIMARY KEY (digest, component))'
+        )
+        self.connection.commit()
+
+    # Returns the key components of the opened file are stored under, or None when the file has no identity on disk
+    def getKey(self, elf):
+        try:
+            status = os.fstat(elf.elf.fileno())
+        except (AttributeError, OSError, ValueError):
+            return None
+        identity = fileIdentity(status)
+        if not self.hashContents:
+            return identity
+        if identity in self.digests:
+            return self.digests[identity]
+        row = self.connection.execute('SELECT digest FROM files WHERE identity = ?', (identity,)).fetchone()
+        if row is not None and not self.rebuild:
+            return row[0]
+        digest = hashlib.sha256(elf.buffer).hexdigest()
+        self.digests[identity] = digest
+        self.flushIfFull()
+        return digest
+
+    # Returns the stored snapshot of a component, raising KeyError when it is not cached
+    def load(self, key, component):
+        if self.rebuild:
+            raise KeyError(component)
+        if key != self.prefetchedKey:
+            # Every component stored for the file is read with one query the first time any of them is asked for
+            rows = self.connection.execute('SELECT component, payload FROM components WHERE digest = ?', (key,)).fetchall()
+            self.prefetched = dict(rows)
+            self.prefetchedKey = key
+        payload = self.prefetched[component]
+        self.accessed[(key, component)] = time.time()
+        self.flushIfFull()
+        return json.loads(zlib.decompress(payload))
+
+    # Stores the snapshot of a component under key
+    def store(self, key, component, snapshot):
+        payload = zlib.compress(json.dumps(snapshot, separators=(',', ':')).encode())
+        self.stored[(key, component)] = (key, component, payload, len(payload), time.time())
+        if key == self.prefetchedKey:
+            self.prefetched[component] = payload
+        self.flushIfFull()
+
+    # Flushes once enough writes are buffered
+    def flushIfFull(self):
+        if len(self.accessed) + len(self.stored) + len(self.digests) >= FLUSH_WRITES:
+            self.flush()
+
+    # Writes the buffered file digests, components and access times in one transaction
+    def flush(self):
+        if not (self.accessed or self.stored or self.digests):
+            return
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO files (identity, digest) VALUES (?, ?)', self.digests.items())
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO components (digest, component, payload, size, lastUsed) VALUES (?, ?, ?, ?, ?)',
+                self.stored.values()
+            )
+            self.connection.executemany(
+                'UPDATE components SET lastUsed = ? WHERE digest = ? AND component = ?',
+                [(used, key, component) for (key, component), used in self.accessed.items()]
+            )
+        self.accessed = {}
+        self.stored = {}
+        self.digests = {}
+
+    # Drops the least recently used files until the stored payloads fit in maxBytes
+    def evict(self):
+        total = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM components').fetchone()[0]
+        if total <= self.maxBytes:
+            return
+        rows = self.connection.execute('SELECT digest, SUM(size), MAX(lastUsed) AS used FROM components GROUP BY digest ORDER BY used').fetchall()
+        for digest, size, _ in rows:
+            if total <= self.maxBytes:
+                break
+            self.connection.execute('DELETE FROM components WHERE digest = ?', (digest,))
+            self.connection.execute('DELETE FROM files WHERE digest = ?', (digest,))
+            total -= size
+        self.connection.commit()
+
+    # Writes what is buffered, evicts down to the size limit and closes the database
+    def close(self):
+        self.flush()
+        self.evict()
+        self.connection.close()
@@ -0,0 +1,80 @@
+import time
+from contextlib import nullcontext
+
+class ParseStats():
+    # Collects what parsing an Elf cost: reads from the mapped file, how many of them jumped to a new offset (the
+    # equivalent of a seek), bytes read, and the calls, wall time, CPU time and records decoded of each phase.
+    # Phases may nest, so the time of an outer phase includes the phases run inside it.
+    def __init__(self) -> None:
+        self.seeks = 0
+        self.reads = 0
+        self.bytesRead = 0
+        self.lastEnd = 0
+        # Phase name -> [calls, wall seconds, CPU seconds, records decoded]
+        self.phases = {}
+
+    # Returns a context manager that adds the time spent inside it to the phase
+    def phase(self, name):
+        return self.PhaseTimer(self, name)
+
+    # Records a read of size bytes at offset
+    def countRead(self, offset, size):
+        if offset != self.lastEnd:
+            self.seeks += 1
+        self.reads += 1
+        self.bytesRead += size
+        self.lastEnd = offset + size
+
+    # Records count records decoded by a phase
+    def countRecords(self, name, count):
+        self.getPhase(name)[3] += count
+
+    def getPhase(self, name):
+        if name not in self.phases:
+            self.phases[name] = [0, 0.0, 0.0, 0]
+        return self.phases[name]
+
+    # Returns everything collected as plain data, suitable for JSON
+    def getSummary(self):
+        return {
+            'seeks': self.seeks,
+            'reads': self.reads,
+            'bytesRead': self.bytesRead,
+            'phases': {
+                name: {'calls': calls, 'wallSeconds': wall, 'cpuSeconds': cpu, 'records': records}
+                for name, (calls, wall, cpu, records) in self.phases.items()
+            },
+        }
+
+    # Returns the summary laid out as a table
+    def formatText(self):
+        lines = [
+            'Reads: %d   Seeks: %d   Bytes read: %d' %(self.reads, self.seeks, self.bytesRead),
+            '\t%-40s %-6s %-12s %-12s %-10s' %('Phase', 'Calls', 'Wall (ms)', 'CPU (ms)', 'Records'),
+        ]
+        for name, (calls, wall, cpu, records) in self.phases.items():
+            lines.append('\t%-40s %-6s %-12.3f %-12.3f %-10s' %(name, calls, wall * 1000, cpu * 1000, records))
+        return '\n'.join(lines)
+
+    class PhaseTimer():
+        def __init__(self, stats, name) -> None:
+            self.stats = stats
+            self.name = name
+
+        def __enter__(self):
+            self.wall = time.perf_counter()
+            self.cpu = time.process_time()
+            return self
+
+        def __exit__(self, *exc):
+            phase = self.stats.getPhase(self.name)
+            phase[0] += 1
+            phase[1] += time.perf_counter() - self.wall
+            phase[2] += time.process_time() - self.cpu
+            return False
+
+# Returns the phase timer of stats, or a context manager that does nothing when profiling is off
+def measurePhase(stats, name):
+    if stats is None:
+        return nullcontext()
+    return stats.phase(name)
@@ -1,19 +1,44 @@
-import struct
-BYTE = 1
-HALFWORD = 2
-WORD = 4
-DOUBLEWORD = 8
 from readelf_clone.lookupDictionary.lookupDictionary import phDictionary
+from readelf_clone.elfStructs import getStruct, unpackTable
+from readelf_clone.renderers import TextRenderer
+from readelf_clone.parseStats import measurePhase
+import sys
 
 class ProgramHeader():
     # Initializes the program header object with attributes that are usable to create entries
-    def __init__(self, elf, arch, phOffset, phNum) -> None:
+    def __init__(self, elf, arch, ei_data, phOffset, phNum, phEntSize) -> None:
         self.elf = elf
         self.arch = arch
+        self.ei_data = ei_data
         self.phOffset = phOffset
         self.phNum = phNum
+        self.phEntSize = phEntSize
         self.entries = self.createEntries()
 
+    # Rebuilds the program header from the fields stored by getSnapshot without decoding the file
+    @classmethod
+    def fromSnapshot(cls, snapshot):
+        programHeader = cls.__new__(cls)
+        programHeader.elf = None
+        programHeader.arch = snapshot['arch']
+        programHeader.ei_data = snapshot['ei_data']
+        programHeader.phOffset = snapshot['phOffset']
+        programHeader.phNum = snapshot['phNum']
+        programHeader.phEntSize = snapshot['phEntSize']
+        programHeader.entries = [cls.ProgramHeaderEntry(values, programHeader.arch) for values in snapshot['entries']]
+        return programHeader
+
+    # Returns the decoded fields in a form that can be stored in the parse cache
+    def getSnapshot(self):
+        return {
+            'arch': self.arch,
+            'ei_data': self.ei_data,
+            'phOffset': self.phOffset,
+            'phNum': self.phNum,
+            'phEntSize': self.phEntSize,
+            'entries': [entry.getValues(self.arch) for entry in self.entries],
+        }
+
     # Matches the valueKey (typically an attibute of the object) with the corresponding key in the corresponding dictionary
     def safeget(self, attributeKey, valueKey):
         try:
@@ -22,58 +47,85 @@ class ProgramHeader():
             return "Unknown"
         return message   
     
-    # Creates the number of entry object specified by the elf header while keeping track of the offset
+    # Creates the number of entry object specified by the elf header, decoding the whole table in one pass
     def createEntries(self):
-        num = self.phNum
-        entryList = []
-        currentOffset = self.phOffset
-        for _ in range(0, num):
-            entryList.append(self.ProgramHeaderEntry(self.elf, currentOffset, self.arch))
-            if self.arch == 1:
-                currentOffset = currentOffset + 32
-            else:
-                currentOffset = currentOffset + 56
-        return entryList     
+        with measurePhase(self.elf.stats, 'ProgramHeader.createEntries'):
+            layout = getStruct('ProgramHeader', self.arch, self.ei_data)
+            records = unpackTable(self.elf, layout, self.phOffset, self.phNum, self.phEntSize)
+            entries = [self.ProgramHeaderEntry(values, self.arch) for values in records]
+        if self.elf.stats is not None:
+            self.elf.stats.countRecords('ProgramHeader.createEntries', len(entries))
+        return entries
+
+    recordFields = ('p_type', 'p_offset', 'p_vaddr', 'p_paddr', 'p_filesz', 'p_memsz', 'p_flags', 'p_align')
+    textHeading = '\t%-15s %-10s %-10s %-10s %-10s %-10s %-5s %s' %('Type', 'Offset', 'VirtAddr', 'PhysAddr', 'FileSiz', 'memSiz', 'Flg', 'Align')
 
     # Prints the stored attributes in the header object and returns them in a similar format to the readelf command.
-    # Source: Visually inspecting readelf results
     def getEntries(self):
-        print('\t%-15s %-10s %-10s %-10s %-10s %-10s %-5s %s' %('Type', 'Offset', 'VirtAddr', 'PhysAddr', 'FileSiz', 'memSiz', 'Flg', 'Align'))
+        TextRenderer(sys.stdout).render('programHeaders', self)
+
+    # Yields one record per program header with the type and flags converted to their names
+    def iterRecords(self):
         for element in self.entries:
-            print('\t%-15s %-10s %-10s %-10s %-10s %-10s %-5s %s' 
-                  %(self.safeget('Type',element.p_type), 
-                  "0x{:06x}".format(element.p_offset), 
-                  "0x{:06x}".format(element.p_vaddr), 
-                  "0x{:06x}".format(element.p_paddr), 
-                  "0x{:06x}".format(element.p_filesz), 
-                  "0x{:06x}".format(element.p_memsz), 
-                  self.safeget('Flag',element.p_flags), 
-                  "0x{:x}".format(element.p_align)))
+            yield {
+                'p_type': self.safeget('Type', element.p_type),
+                'p_offset': element.p_offset,
+                'p_vaddr': element.p_vaddr,
+                'p_paddr': element.p_paddr,
+                'p_filesz': element.p_filesz,
+                'p_memsz': element.p_memsz,
+                'p_flags': self.safeget('Flag', element.p_flags),
+                'p_align': element.p_align,
+            }
+
+    # Returns the text table line for one record
+    # Source: Visually inspecting readelf results
+    def formatText(self, record):
+        return ('\t%-15s %-10s %-10s %-10s %-10s %-10s %-5s %s' 
+                %(record['p_type'], 
+                "0x{:06x}".format(record['p_offset']), 
+                "0x{:06x}".format(record['p_vaddr']), 
+                "0x{:06x}".format(record['p_paddr']), 
+                "0x{:06x}".format(record['p_filesz']), 
+                "0x{:06x}".format(record['p_memsz']), 
+                record['p_flags'], 
+                "0x{:x}".format(record['p_align'])))
             
     class ProgramHeaderEntry():
-        # Initializes a program header entry and unpacks the bytes sequentially with the corresponding size from documention
+        __slots__ = ('p_type', 'p_offset', 'p_vaddr', 'p_paddr', 'p_filesz', 'p_memsz', 'p_flags', 'p_align')
+
+        # Initializes a program header entry from the fields unpacked in the order given by the documention
         # Source: 
         #    https://refspecs.linuxbase.org/elf/gabi4+/
         #    https://wiki.osdev.org/ELF_Tutorial
         #    https://en.wikipedia.org/wiki/Executable_and_Linkable_Format
         #    https://man7.org/linux/man-pages/man5/elf.5.html
-        def __init__(self, elf, offset, arch) -> None:
-            elf.seek(offset)
+        def __init__(self, values, arch) -> None:
             if arch == 1:
-                self.p_type   = struct.unpack('I', elf.read(WORD))[0]
-                self.p_offset = struct.unpack('I', elf.read(WORD))[0]
-                self.p_vaddr  = struct.unpack('I', elf.read(WORD))[0]
-                self.p_paddr  = struct.unpack('I', elf.read(WORD))[0]
-                self.p_filesz = struct.unpack('I', elf.read(WORD))[0]
-                self.p_memsz  = struct.unpack('I', elf.read(WORD))[0]
-                self.p_flags  = struct.unpack('I', elf.read(WORD))[0]
-                self.p_align  = struct.unpack('I', elf.read(WORD))[0]
+                (
+                    self.p_type,
+                    self.p_offset,
+                    self.p_vaddr,
+                    self.p_paddr,
+                    self.p_filesz,
+                    self.p_memsz,
+                    self.p_flags,
+                    self.p_align,
+                ) = values
             else:
-                self.p_type = struct.unpack('I', elf.read(WORD))[0]
-                self.p_flags = struct.unpack('I', elf.read(WORD))[0]
-                self.p_offset = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.p_vaddr = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.p_paddr = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.p_filesz = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.p_memsz = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.p_align = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
\ No newline at end of file
+                (
+                    self.p_type,
+                    self.p_flags,
+                    self.p_offset,
+                    self.p_vaddr,
+                    self.p_paddr,
+                    self.p_filesz,
+                    self.p_memsz,
+                    self.p_align,
+                ) = values
+
+        # Returns the fields in the order they were unpacked in
+        def getValues(self, arch):
+            if arch == 1:
+                return (self.p_type, self.p_offset, self.p_vaddr, self.p_paddr, self.p_filesz, self.p_memsz, self.p_flags, self.p_align)
+            return (self.p_type, self.p_flags, self.p_offset, self.p_vaddr, self.p_paddr, self.p_filesz, self.p_memsz, self.p_align)
@@ -0,0 +1,105 @@
+from readelf_clone.lookupDictionary.lookupDictionary import rDictionary
+from readelf_clone.elfStructs import getStruct, unpackTable
+from readelf_clone.renderers import TextRenderer
+import sys
+
+SHT_RELA = 4
+SHT_REL = 9
+
+class Relocations():
+    # Decodes every SHT_REL and SHT_RELA section of the file. Each section is unpacked in one pass and the symbols its
+    # entries refer to are resolved once per distinct symbol index against the symbol table the section links to,
+    # instead of once per entry. symbolTableFor(index) returns the SymbolTable in the section at index, or None.
+    # r_info holds the symbol index and the type, split at bit 8 in 32-bit files and at bit 32 in 64-bit files.
+    # Source:
+    #    https://refspecs.linuxbase.org/elf/gabi4+/ch4.reloc.html
+    #    https://man7.org/linux/man-pages/man5/elf.5.html
+    def __init__(self, elf, ei_class, ei_data, e_machine, sectionEntries, sectionNames, symbolTableFor) -> None:
+        self.elf = elf
+        self.ei_class = ei_class
+        self.ei_data = ei_data
+        self.e_machine = e_machine
+        self.sectionNames = sectionNames
+        self.entries = []
+        for index, section in enumerate(sectionEntries):
+            if section.sh_type in (SHT_REL, SHT_RELA):
+                self.entries.extend(self.createEntries(sectionNames[index], section, symbolTableFor(section.sh_link) if section.sh_link else None))
+
+    # Creates the entries of one relocation section and attaches the symbol every entry refers to
+    def createEntries(self, name, section, symbolTable):
+        layout = getStruct('Rela' if section.sh_type == SHT_RELA else 'Rel', self.ei_class, self.ei_data)
+        stride = section.sh_entsize or layout.size
+        shift, mask = (8, 0xff) if self.ei_class == 1 else (32, 0xffffffff)
+        entries = [self.RelocationEntry(name, values, shift, mask) for values in unpackTable(self.elf, layout, section.sh_offset, section.sh_size // stride, stride)]
+        if symbolTable is not None:
+            symbolCount = len(symbolTable.entries)
+            symbols = {index: symbolTable.entries[index] for index in {entry.r_sym for entry in entries} if 0 < index < symbolCount}
+            for entry in entries:
+                entry.symbol = symbols.get(entry.r_sym)
+        return entries
+
+    # Returns the entries of the relocation section called name, in table order
+    def getSectionEntries(self, name):
+        return [entry for entry in self.entries if entry.section == name]
+
+    # Returns the name of a relocation type for the machine of the file
+    def getTypeName(self, r_type):
+        try:
+            return rDictionary[self.e_machine][r_type]
+        except KeyError:
+            return 'Unknown (%d)' %(r_type)
+
+    recordFields = ('section', 'r_offset', 'r_info', 'type', 'r_sym', 'symbolValue', 'symbolName', 'r_addend')
+    textHeading = '\t%-15s %-16s %-16s %-26s %-16s %s' %('Section', 'Offset', 'Info', 'Type', 'Sym. Value', 'Sym. Name + Addend')
+
+    # Iterates over the list of relocations and returns the results from their respective fields.
+    def getRelocations(self):
+        TextRenderer(sys.stdout).render('relocations', self)
+
+    # Yields one record per relocation, with the value and name of its symbol when it has one and None as the addend of REL entries
+    def iterRecords(self):
+        for entry in self.entries:
+            yield {
+                'section': entry.section,
+                'r_offset': entry.r_offset,
+                'r_info': entry.r_info,
+                'type': self.getTypeName(entry.r_type),
+                'r_sym': entry.r_sym,
+                'symbolValue': entry.symbol.st_value if entry.symbol is not None else None,
+                'symbolName': entry.symbol.st_converted_name if entry.symbol is not None else None,
+                'r_addend': entry.r_addend,
+            }
+
+    # Returns the text table line for one record
+    # Source: Visually inspecting readelf results
+    def formatText(self, record):
+        width = 8 if self.ei_class == 1 else 16
+        if record['symbolName'] is None:
+            target = '' if record['r_addend'] is None else '%x' %(record['r_addend'])
+        elif record['r_addend'] is None:
+            target = record['symbolName']
+        else:
+            target = '%s %s %x' %(record['symbolName'], '-' if record['r_addend'] < 0 else '+', abs(record['r_addend']))
+        return ('\t%-15s %-16s %-16s %-26s %-16s %s'
+                %(
+                    record['section'],
+                    '{:0{}x}'.format(record['r_offset'], width),
+                    '{:0{}x}'.format(record['r_info'], width),
+                    record['type'],
+                    '' if record['symbolValue'] is None else '{:0{}x}'.format(record['symbolValue'], width),
+                    target
+                ))
+
+    class RelocationEntry():
+        __slots__ = ('section', 'r_offset', 'r_info', 'r_addend', 'r_sym', 'r_type', 'symbol')
+
+        # Initializes a relocation from the fields unpacked in the order given by the documentation, the addend
+        # being None for REL entries
+        def __init__(self, section, values, shift, mask) -> None:
+            self.section = section
+            self.r_offset = values[0]
+            self.r_info = values[1]
+            self.r_addend = values[2] if len(values) > 2 else None
+            self.r_sym = self.r_info >> shift
+            self.r_type = self.r_info & mask
+            self.symbol = None
@@ -0,0 +1,106 @@
+import io
+import os
+import sys
+import csv
+import json
+
+# Every component that can be rendered provides:
+#    recordFields   the keys of the records it yields, in column order
+#    iterRecords()  a generator of one dict per row, with numbers left as ints
+#    textHeading    the heading line of its text table, or None
+#    formatText()   the text table line(s) for one record
+
+# Opens a large buffered text stream over stdout so rendering does not flush once per line
+def openOutput(bufferSize=1 << 20):
+    sys.stdout.flush()
+    return io.open(os.dup(sys.stdout.fileno()), 'w', buffering=bufferSize, encoding='utf-8', newline='')
+
+class TextRenderer():
+    # Writes the tables laid out like the readelf command
+    def __init__(self, stream) -> None:
+        self.stream = stream
+
+    def caption(self, text):
+        self.stream.write(text + '\n')
+
+    def render(self, table, component):
+        write = self.stream.write
+        if component.textHeading is not None:
+            write(component.textHeading + '\n')
+        for record in component.iterRecords():
+            write(component.formatText(record) + '\n')
+
+class JsonLinesRenderer():
+    # Writes one JSON object per record, tagged with the table it came from
+    # Source: https://jsonlines.org/
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.encoder = json.JSONEncoder(separators=(',', ':'))
+
+    def caption(self, text):
+        pass
+
+    def render(self, table, component):
+        write = self.stream.write
+        encode = self.encoder.encode
+        for record in component.iterRecords():
+            record['table'] = table
+            write(encode(record) + '\n')
+
+class CsvRenderer():
+    # Writes each table as a block of CSV rows led by its column names, with a blank line between tables
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.tables = 0
+
+    def caption(self, text):
+        pass
+
+    def render(self, table, component):
+        if self.tables:
+            self.stream.write('\n')
+        self.tables += 1
+        writer = csv.writer(self.stream)
+        writer.writerow(('table',) + component.recordFields)
+        writer.writerows((table,) + tuple(record[field] for field in component.recordFields) for record in component.iterRecords())
+
+# The tables a single file is displayed as, in display order:
+#    option     the main.py option that selects the table
+#    table      the name the table is rendered under
+#    attribute  the Elf attribute holding the component, which is None when the file does not have it
+#    caption    the caption written before the table
+#    missing    the caption written instead when the file does not have it
+TABLES = (
+    ('header', 'header', 'header', 'Displaying the ELF header', None),
+    ('program', 'programHeaders', 'programHeader', 'Displaying the program headers', None),
+    ('program', 'segmentMapping', 'segmentMapping', 'Displaying the section to segment mapping', None),
+    ('section', 'sections', 'sectionHeader', 'Displaying the section headers', None),
+    ('symbol', 'symbols', 'symbolTable', 'Displaying the symbol table', 'There is no symbol table'),
+    ('dynamicsymbol', 'dynamicSymbols', 'dynamicSymbolTable', 'Displaying the dynamic symbol table', 'There is no dynamic symbol table'),
+    ('dynamic', 'dynamic', 'dynamicSection', 'Displaying the dynamic section', 'There is no dynamic section'),
+    ('relocs', 'relocations', 'relocations', 'Displaying the relocations', 'There are no relocations'),
+    ('notes', 'notes', 'notes', 'Displaying the notes', 'There are no notes'),
+)
+
+# Renders the tables of an Elf selected by option name (every table when selected is None) in display order.
+# transform, when given, is called with the table name and component and returns the component to render instead.
+def renderTables(elf, renderer, selected=None, transform=None):
+    for option, table, attribute, caption, missing in TABLES:
+        if selected is not None and option not in selected:
+            continue
+        component = getattr(elf, attribute)
+        if component is None:
+            renderer.caption('\n' + missing)
+        else:
+            renderer.caption('\n' + caption)
+            renderer.render(table, component if transform is None else transform(table, component))
+
+renderers = {
+    'text': TextRenderer,
+    'jsonl': JsonLinesRenderer,
+    'csv': CsvRenderer,
+}
+
+# Returns the renderer for an --output-format value
+def createRenderer(outputFormat, stream):
+    return renderers[outputFormat](stream)
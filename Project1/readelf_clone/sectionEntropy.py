@@ -0,0 +1,160 @@
+import hashlib
+import math
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from readelf_clone.elf import Elf
+from readelf_clone.renderers import TextRenderer
+try:
+    import numpy
+except ImportError:
+    numpy = None
+# Fuzzy hashing uses whichever of ssdeep or TLSH is installed, preferring ssdeep
+try:
+    import ssdeep
+except ImportError:
+    ssdeep = None
+try:
+    import tlsh
+except ImportError:
+    tlsh = None
+
+SHT_NOBITS = 8
+# Sections are read this many bytes at a time, so a huge section never needs more than one chunk of working memory
+CHUNK_SIZE = 1 << 20
+
+# Returns the name of the fuzzy hash written in the fuzzy column, or None when neither library is installed
+def fuzzyHashName():
+    if ssdeep is not None:
+        return 'ssdeep'
+    if tlsh is not None:
+        return 'tlsh'
+    return None
+
+# Returns a new incremental fuzzy hasher, or None when neither library is installed
+# Source:
+#    https://python-ssdeep.readthedocs.io/en/latest/usage.html
+#    https://github.com/trendmicro/tlsh/tree/master/py_ext
+def createFuzzyHasher():
+    if ssdeep is not None:
+        return ssdeep.Hash()
+    if tlsh is not None:
+        return tlsh.Tlsh()
+    return None
+
+# Returns the digest of a fuzzy hasher, or None when it was given too little data to hash
+def finishFuzzyHasher(hasher):
+    if hasher is None:
+        return None
+    try:
+        if ssdeep is not None:
+            return hasher.digest()
+        hasher.final()
+        digest = hasher.hexdigest()
+        return None if digest in ('', 'TNULL') else digest
+    except Exception:
+        return None
+
+# Returns the number of times every byte value occurs in chunk as a list of 256 counts.
+# NumPy counts in one bincount over the chunk; without it each value is counted by bytes.count, which still runs in C.
+def countBytes(chunk):
+    if numpy is not None:
+        return numpy.bincount(numpy.frombuffer(chunk, dtype=numpy.uint8), minlength=256)
+    data = bytes(chunk)
+    return [data.count(value) for value in range(256)]
+
+# Returns the Shannon entropy in bits per byte (0 to 8) of the byte value counts of total bytes
+# Source: https://en.wikipedia.org/wiki/Entropy_(information_theory)
+def shannonEntropy(counts, total):
+    if not total:
+        return 0.0
+    if numpy is not None:
+        probabilities = counts[counts > 0] / total
+        return float(-(probabilities * numpy.log2(probabilities)).sum())
+    return -sum(count / total * math.log2(count / total) for count in counts if count)
+
+# Returns the entropy, SHA-256 and fuzzy hash of size bytes at offset, reading them chunkSize bytes at a time
+def measureRegion(data, offset, size, chunkSize=CHUNK_SIZE):
+    counts = numpy.zeros(256, dtype=numpy.int64) if numpy is not None else [0] * 256
+    sha256 = hashlib.sha256()
+    fuzzy = createFuzzyHasher()
+    for start in range(offset, offset + size, chunkSize):
+        chunk = data.view(start, min(chunkSize, offset + size - start))
+        if numpy is not None:
+            counts += countBytes(chunk)
+        else:
+            counts = [total + count for total, count in zip(counts, countBytes(chunk))]
+        sha256.update(chunk)
+        if fuzzy is not None:
+            fuzzy.update(bytes(chunk))
+        chunk.release()
+    return shannonEntropy(counts, size), sha256.hexdigest(), finishFuzzyHasher(fuzzy)
+
+class SectionEntropy():
+    # Measures the Shannon entropy, SHA-256 and fuzzy hash (ssdeep or TLSH, when installed) of the bytes of every section,
+    # for spotting packed or encrypted sections: compressed and encrypted data sits close to 8 bits per byte.
+    # Sections are read from zero-copy views of the file in chunks and measured by a pool of threads, since hashlib and
+    # NumPy do their work on large buffers without holding the GIL. Sections with no bytes in the file (SHT_NOBITS and
+    # the null section) are listed without measurements. A section that cannot be read, such as one running past the end
+    # of a truncated file, is listed with the reason in its error field and the other sections are still measured.
+    def __init__(self, elf, sectionEntries, sectionNames, workers=None, chunkSize=CHUNK_SIZE) -> None:
+        self.elf = elf
+        self.chunkSize = chunkSize
+        self.fuzzyHash = fuzzyHashName()
+        workers = workers or os.cpu_count() or 1
+        sections = list(enumerate(sectionEntries))
+        if workers == 1 or len(sections) < 2:
+            self.records = [self.measureSection(index, section, sectionNames[index]) for index, section in sections]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                self.records = list(executor.map(lambda item: self.measureSection(item[0], item[1], sectionNames[item[0]]), sections))
+
+    # Returns the record of one section, with error set instead of the measurements when its bytes cannot be read
+    def measureSection(self, index, section, name):
+        record = {
+            'index': index,
+            'name': name,
+            'size': section.sh_size,
+            'entropy': None,
+            'sha256': None,
+            'fuzzy': None,
+            'error': None,
+        }
+        if index and section.sh_type != SHT_NOBITS:
+            try:
+                record['entropy'], record['sha256'], record['fuzzy'] = measureRegion(self.elf, section.sh_offset, section.sh_size, self.chunkSize)
+            except Exception as error:
+                record['error'] = str(error)
+        return record
+
+    recordFields = ('index', 'name', 'size', 'entropy', 'sha256', 'fuzzy', 'error')
+    textHeading = '\t%-5s %-25s %-10s %-8s %-64s %s' %('Nr', 'Name', 'Size', 'Entropy', 'SHA-256', 'Fuzzy hash')
+
+    # Prints the measurements of every section in a similar format to the other tables
+    def getSectionEntropy(self):
+        TextRenderer(sys.stdout).render('entropy', self)
+
+    # Yields the record of every section in section header order
+    def iterRecords(self):
+        yield from (dict(record) for record in self.records)
+
+    # Returns the text table line for one record, with the error in place of the measurements of an unreadable section
+    def formatText(self, record):
+        return ('\t%-5s %-25s %-10s %-8s %-64s %s'
+                %(
+                    '[%d]' %(record['index']),
+                    record['name'],
+                    "0x{:06x}".format(record['size']),
+                    '-' if record['entropy'] is None else '%.4f' %(record['entropy']),
+                    record['sha256'] or ('error: ' + record['error'] if record['error'] else '-'),
+                    record['fuzzy'] or '-'
+                ))
+
+# Opens the file at path and measures its sections with workers threads
+def measureFile(path, workers=None, cache=None):
+    with open(path, 'rb') as elfFile:
+        elf = Elf(elfFile, cache)
+        try:
+            return SectionEntropy(elf.data, elf.sectionHeader.entries, elf.sectionHeader.names, workers)
+        finally:
+            elf.close()
@@ -1,35 +1,80 @@
-import struct
 from readelf_clone.lookupDictionary.lookupDictionary import shDictionary
-BYTE = 1
-HALFWORD = 2
-WORD = 4
-DOUBLEWORD = 8
+from readelf_clone.elfStructs import getStruct, unpackTable
+from readelf_clone.stringTable import StringTable
+from readelf_clone.renderers import TextRenderer
+from readelf_clone.parseStats import measurePhase
+import sys
 
 class SectionHeader():
     # Initializes the program header object with attributes that are usable to create sections
-    def __init__(self, elf, ei_class, e_shoff, e_shentsize, e_shnum, e_shstrndx) -> None:
+    def __init__(self, elf, ei_class, ei_data, e_shoff, e_shentsize, e_shnum, e_shstrndx) -> None:
         self.elf = elf
         self.ei_class = ei_class
+        self.ei_data = ei_data
         self.e_shoff = e_shoff
         self.e_shentsize = e_shentsize
         self.e_shnum = e_shnum
         self.e_shstrndx = e_shstrndx
         self.entries = self.createSections()
-        self.indexSYMTAB = -1
-        self.indexSTRTAB = -1
-        self.indexDYNSYM = -1
-        self.indexDYNSTR = -1
-        # An unclean way to get important indexes for the symbol and strings tables from the list of sections.
-        for count, element in enumerate(self.entries):
-            if self.getSHStringTable(element.sh_name) == '.symtab':
-                self.indexSYMTAB = count
-            elif self.getSHStringTable(element.sh_name) == '.strtab':
-                self.indexSTRTAB = count  
-            elif self.getSHStringTable(element.sh_name) == '.dynsym':
-                self.indexDYNSYM = count
-            elif self.getSHStringTable(element.sh_name) == '.dynstr':
-                self.indexDYNSTR = count
-        
+        # The section header string table, located once and shared by every name lookup
+        self.stringTable = StringTable(elf, self.entries[e_shstrndx]) if e_shstrndx < len(self.entries) else None
+        with measurePhase(elf.stats, 'SectionHeader.buildIndex'):
+            self.buildIndex()
+
+    # Resolves every section name once and indexes the sections by name and by type, so finding the symbol and
+    # string tables (or any other section) is a dictionary lookup and no name is read from the file twice
+    def buildIndex(self):
+        if self.stringTable is not None:
+            self.names = [self.getSHStringTable(entry.sh_name) for entry in self.entries]
+        else:
+            self.names = ['NULL'] * len(self.entries)
+        # Name -> index of the first section with that name
+        self.sectionIndex = {}
+        # sh_type -> indexes of every section of that type, in table order
+        self.typeIndex = {}
+        for index, entry in enumerate(self.entries):
+            self.sectionIndex.setdefault(self.names[index], index)
+            self.typeIndex.setdefault(entry.sh_type, []).append(index)
+        self.indexSYMTAB = self.getSectionIndex('.symtab')
+        self.indexSTRTAB = self.getSectionIndex('.strtab')
+        self.indexDYNSYM = self.getSectionIndex('.dynsym')
+        self.indexDYNSTR = self.getSectionIndex('.dynstr')
+
+    # Returns the index of the section called name, or -1 when there is none
+    def getSectionIndex(self, name):
+        return self.sectionIndex.get(name, -1)
+
+    # Returns the entry of the section called name, or None when there is none
+    def get_section(self, name):
+        index = self.sectionIndex.get(name)
+        if index is None:
+            return None
+        return self.entries[index]
+
+    # Returns the indexes of every section of the given sh_type (e.g. 7 for SHT_NOTE), in table order
+    def sections_of_type(self, sh_type):
+        return list(self.typeIndex.get(sh_type, ()))
+
+    # Rebuilds the section header from the fields stored by getSnapshot without decoding the file
+    @classmethod
+    def fromSnapshot(cls, snapshot):
+        sectionHeader = cls.__new__(cls)
+        sectionHeader.__dict__.update(snapshot)
+        sectionHeader.elf = None
+        sectionHeader.entries = [cls.SectionHeaderEntry(values) for values in snapshot['entries']]
+        sectionHeader.stringTable = StringTable.fromSnapshot(snapshot['stringTable'])
+        # Every name was resolved before the snapshot was taken, so the index is rebuilt without the file
+        sectionHeader.buildIndex()
+        return sectionHeader
+
+    # Returns the decoded fields in a form that can be stored in the parse cache. The indexes are left out and rebuilt
+    # from the string table, whose names were all resolved by buildIndex.
+    def getSnapshot(self):
+        snapshot = {key: value for key, value in vars(self).items() if key not in ('elf', 'names', 'sectionIndex', 'typeIndex')}
+        snapshot['entries'] = [entry.getValues() for entry in self.entries]
+        snapshot['stringTable'] = self.stringTable.getSnapshot() if self.stringTable is not None else {}
+        return snapshot
+
     # Matches the valueKey (typically an attibute of the object) with the corresponding key in the corresponding dictionary
     def safeget(self, attributeKey, valueKey):
         try:
@@ -40,82 +85,89 @@ class SectionHeader():
     
     # Returns the corresponding string for the name offset in the section header string table
     def getSHStringTable(self, sh_name):
-        # Uses the section header string index from the header to find the corresponding entry
-        stringSectionObject = self.entries[self.e_shstrndx]
-        # Sets the starting location for reading at the section header offset + the section header name offset insides the section header string index
-        self.elf.seek(stringSectionObject.sh_offset + sh_name)
-        data = self.elf.read(self.e_shentsize)
-        # Splits the byte code and grabs the first element/string after the combined offset
-        output = data.split(b"\x00")[0].decode()
+        output = self.stringTable.getString(sh_name)
         if output == '':
             return 'NULL'
         return output
     
-    # Creates and returns a list of sections that can be iterated over
+    # Creates and returns a list of sections that can be iterated over, decoding the whole table in one pass
     def createSections(self):
-        num = self.e_shnum
-        entryList = []
-        currentOffset = self.e_shoff
-        for _ in range(0, num):
-            entryList.append(self.SectionHeaderEntry(self.elf, currentOffset, self.ei_class))
-            if self.ei_class == 1:
-                currentOffset = currentOffset + 40
-            else:
-                currentOffset = currentOffset + 64
-        return entryList
+        with measurePhase(self.elf.stats, 'SectionHeader.createSections'):
+            layout = getStruct('SectionHeader', self.ei_class, self.ei_data)
+            records = unpackTable(self.elf, layout, self.e_shoff, self.e_shnum, self.e_shentsize)
+            entries = [self.SectionHeaderEntry(values) for values in records]
+        if self.elf.stats is not None:
+            self.elf.stats.countRecords('SectionHeader.createSections', len(entries))
+        return entries
     
+    recordFields = ('index', 'name', 'sh_type', 'sh_addr', 'sh_offset', 'sh_size', 'sh_entsize', 'sh_flags', 'sh_link', 'sh_info', 'sh_addralign')
+    textHeading = '\t%-5s %-19s %-13s %-8s %-8s %-8s %-4s %-6s %-4s %-5s %-6s' %('[Nr]', 'Name', 'Type', 'Addr', 'Off', 'Size', 'ES', 'Flag', 'Lk', 'Inf', 'Al')
+
     # Iterates over the list of sections and returns the results from their respective fields.
-    # Source: Visually inspecting readelf results
     def getSections(self):
-        print('\t%-5s %-19s %-13s %-8s %-8s %-8s %-4s %-6s %-4s %-5s %-6s' %('[Nr]', 'Name', 'Type', 'Addr', 'Off', 'Size', 'ES', 'Flag', 'Lk', 'Inf', 'Al'))
+        TextRenderer(sys.stdout).render('sections', self)
+
+    # Yields one record per section with the name, type and flags converted to strings
+    def iterRecords(self):
         for index,entry in enumerate(self.entries):
-            number = '[%s]'%(index)
             converted_flags = ''
             for key, value in shDictionary['Flags'].items():
                 if entry.sh_flags & key or entry.sh_flags == key:
                     converted_flags += value
-            print('\t%-5s %-19s %-13s %-8s %-8s %-8s %-4s %-6s %-4s %-5s %-6s' 
-                  %(
-                    number, 
-                    self.getSHStringTable(entry.sh_name), 
-                    self.safeget('Type',entry.sh_type), 
-                    "{:06x}".format(entry.sh_addr), 
-                    "{:06x}".format(entry.sh_offset), 
-                    "{:06x}".format(entry.sh_size), 
-                    "{:02x}".format(entry.sh_entsize),
-                    converted_flags,
-                    entry.sh_link, 
-                    entry.sh_info, 
-                    entry.sh_addralign))
+            yield {
+                'index': index,
+                'name': self.names[index],
+                'sh_type': self.safeget('Type',entry.sh_type),
+                'sh_addr': entry.sh_addr,
+                'sh_offset': entry.sh_offset,
+                'sh_size': entry.sh_size,
+                'sh_entsize': entry.sh_entsize,
+                'sh_flags': converted_flags,
+                'sh_link': entry.sh_link,
+                'sh_info': entry.sh_info,
+                'sh_addralign': entry.sh_addralign,
+            }
+
+    # Returns the text table line for one record
+    # Source: Visually inspecting readelf results
+    def formatText(self, record):
+        return ('\t%-5s %-19s %-13s %-8s %-8s %-8s %-4s %-6s %-4s %-5s %-6s' 
+                %(
+                '[%s]'%(record['index']), 
+                record['name'], 
+                record['sh_type'], 
+                "{:06x}".format(record['sh_addr']), 
+                "{:06x}".format(record['sh_offset']), 
+                "{:06x}".format(record['sh_size']), 
+                "{:02x}".format(record['sh_entsize']),
+                record['sh_flags'],
+                record['sh_link'], 
+                record['sh_info'], 
+                record['sh_addralign']))
             
     class SectionHeaderEntry():
-        # Initializes a section header entry and unpacks the bytes sequentially with the corresponding size from documention
+        __slots__ = ('sh_name', 'sh_type', 'sh_flags', 'sh_addr', 'sh_offset', 'sh_size', 'sh_link', 'sh_info', 'sh_addralign', 'sh_entsize')
+
+        # Initializes a section header entry from the fields unpacked in the order given by the documention
         # Source: 
         #    https://refspecs.linuxbase.org/elf/gabi4+/
         #    https://wiki.osdev.org/ELF_Tutorial
         #    https://en.wikipedia.org/wiki/Executable_and_Linkable_Format
         #    https://man7.org/linux/man-pages/man5/elf.5.html
-        def __init__(self, elf, offset, arch) -> None:
-            elf.seek(offset)
-            if arch == 1:
-                self.sh_name   = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_type = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_flags  = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_addr  = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_offset = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_size  = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_link  = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_info  = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_addralign  = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_entsize  = struct.unpack('I', elf.read(WORD))[0] 
-            else:
-                self.sh_name   = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_type = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_flags  = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.sh_addr  = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.sh_offset = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.sh_size  = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.sh_link  = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_info  = struct.unpack('I', elf.read(WORD))[0]
-                self.sh_addralign  = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
-                self.sh_entsize  = struct.unpack('Q', elf.read(DOUBLEWORD))[0]
\ No newline at end of file
+        def __init__(self, values) -> None:
+            (
+                self.sh_name,
+                self.sh_type,
+                self.sh_flags,
+                self.sh_addr,
+                self.sh_offset,
+                self.sh_size,
+                self.sh_link,
+                self.sh_info,
+                self.sh_addralign,
+                self.sh_entsize,
+            ) = values
+
+        # Returns the fields in the order they were unpacked in
+        def getValues(self):
+            return (self.sh_name, self.sh_type, self.sh_flags, self.sh_addr, self.sh_offset, self.sh_size, self.sh_link, self.sh_info, self.sh_addralign, self.sh_entsize)
@@ -0,0 +1,87 @@
+from bisect import bisect_right
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+PT_LOAD = 1
+
+class SegmentIndex():
+    # Sorts the PT_LOAD segments by virtual address once so translating an address is a single bisect.
+    # Each segment maps [p_vaddr, p_vaddr + p_filesz) to the file at p_offset. The rest of the segment up to p_memsz
+    # (the .bss) has no bytes in the file and reads as zeros.
+    # Source: https://refspecs.linuxbase.org/elf/gabi4+/ch5.pheader.html
+    def __init__(self, elf, programEntries) -> None:
+        self.elf = elf
+        self.segments = sorted((entry for entry in programEntries if entry.p_type == PT_LOAD and entry.p_memsz), key=lambda entry: entry.p_vaddr)
+        self.starts = [segment.p_vaddr for segment in self.segments]
+        self.startArray = None
+        if numpy is not None:
+            # The columns of the sorted segments that vaddrs_to_offsets translates with
+            self.startArray = numpy.array(self.starts, dtype=numpy.uint64)
+            self.memszArray = numpy.array([segment.p_memsz for segment in self.segments], dtype=numpy.uint64)
+            self.fileszArray = numpy.array([segment.p_filesz for segment in self.segments], dtype=numpy.uint64)
+            self.offsetArray = numpy.array([segment.p_offset for segment in self.segments], dtype=numpy.uint64)
+
+    # Returns the loaded segment whose memory contains addr, or None
+    def findSegment(self, addr):
+        position = bisect_right(self.starts, addr) - 1
+        if position < 0:
+            return None
+        segment = self.segments[position]
+        if addr >= segment.p_vaddr + segment.p_memsz:
+            return None
+        return segment
+
+    # Returns the file offset holding the byte at addr, or None when addr is not loaded or lies in the zero-filled part of a segment
+    def vaddr_to_offset(self, addr):
+        segment = self.findSegment(addr)
+        return self.translate(segment, addr)
+
+    # Returns the file offset of addr inside segment, or None
+    def translate(self, segment, addr):
+        if segment is None or addr - segment.p_vaddr >= segment.p_filesz:
+            return None
+        return segment.p_offset + addr - segment.p_vaddr
+
+    # Returns the file offset (or None) of every address, in the order given.
+    # With NumPy the segment of every address is found with one searchsorted, and the bounds check and the
+    # p_offset + addr - p_vaddr arithmetic run on the gathered segment columns, so no Python code runs per address.
+    # Without NumPy a single merge over the sorted addresses is used.
+    def vaddrs_to_offsets(self, addrs):
+        addrs = list(addrs)
+        if not self.segments:
+            return [None] * len(addrs)
+        if self.startArray is not None:
+            addrArray = numpy.array(addrs, dtype=numpy.uint64)
+            positions = numpy.searchsorted(self.startArray, addrArray, side='right') - 1
+            clipped = numpy.maximum(positions, 0)
+            # Addresses before the first segment get a nonsense delta, which the position check discards
+            delta = addrArray - self.startArray[clipped]
+            valid = (positions >= 0) & (delta < self.fileszArray[clipped]) & (delta < self.memszArray[clipped])
+            results = numpy.full(len(addrs), None, dtype=object)
+            results[valid] = (self.offsetArray[clipped] + delta)[valid]
+            return results.tolist()
+        results = [None] * len(addrs)
+        position = -1
+        for index in sorted(range(len(addrs)), key=addrs.__getitem__):
+            addr = addrs[index]
+            while position + 1 < len(self.starts) and self.starts[position + 1] <= addr:
+                position += 1
+            segment = self.segments[position] if position >= 0 else None
+            if segment is not None and addr < segment.p_vaddr + segment.p_memsz:
+                results[index] = self.translate(segment, addr)
+        return results
+
+    # Returns the size bytes loaded at addr. Bytes wholly backed by the file are returned as a zero-copy view of the
+    # mapping; a read reaching into the zero-filled part of a segment is returned as bytes padded with zeros.
+    # Raises when the range is not inside a single loaded segment.
+    def read_at_vaddr(self, addr, size):
+        segment = self.findSegment(addr)
+        if segment is None or addr + size > segment.p_vaddr + segment.p_memsz:
+            raise Exception('Read of %d bytes at address 0x%x is outside of the loaded segments' %(size, addr))
+        start = addr - segment.p_vaddr
+        if start + size <= segment.p_filesz:
+            return self.elf.view(segment.p_offset + start, size)
+        backed = max(0, min(size, segment.p_filesz - start))
+        return bytes(self.elf.view(segment.p_offset + start, backed)) + bytes(size - backed)
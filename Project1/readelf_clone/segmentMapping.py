@@ -0,0 +1,125 @@
+from readelf_clone.renderers import TextRenderer
+import sys
+
+SHT_NOBITS = 8
+SHF_ALLOC = 0x2
+SHF_TLS = 0x400
+PT_DYNAMIC = 2
+PT_NOTE = 4
+PT_PHDR = 6
+PT_TLS = 7
+PT_LOAD = 1
+PT_GNU_EH_FRAME = 0x6474e550
+PT_GNU_STACK = 0x6474e551
+PT_GNU_RELRO = 0x6474e552
+PT_GNU_SFRAME = 0x6474e554
+PT_GNU_MBIND_LO = 0x6474e555
+PT_GNU_MBIND_HI = 0x6474f554
+
+# Returns the size a section takes up in a segment: a .tbss section takes no room outside of the PT_TLS segment
+def sectionSize(section, segment):
+    if section.sh_type == SHT_NOBITS and section.sh_flags & SHF_TLS and segment.p_type != PT_TLS:
+        return 0
+    return section.sh_size
+
+# Returns True when readelf would list section in segment, following the strict rule binutils uses
+# Source: ELF_SECTION_IN_SEGMENT_STRICT in binutils include/elf/internal.h
+def sectionInSegment(section, segment):
+    tls = section.sh_flags & SHF_TLS
+    alloc = section.sh_flags & SHF_ALLOC
+    nobits = section.sh_type == SHT_NOBITS
+    # .tbss is only shown in the PT_TLS segment
+    if nobits and tls and segment.p_type != PT_TLS:
+        return False
+    # Only PT_LOAD, PT_GNU_RELRO and PT_TLS segments hold TLS sections, PT_TLS holds nothing else and PT_PHDR holds no sections
+    if tls:
+        if segment.p_type not in (PT_TLS, PT_GNU_RELRO, PT_LOAD):
+            return False
+    elif segment.p_type in (PT_TLS, PT_PHDR):
+        return False
+    # Loaded segments only hold allocated sections
+    if not alloc and (segment.p_type in (PT_LOAD, PT_DYNAMIC, PT_GNU_EH_FRAME, PT_GNU_STACK, PT_GNU_RELRO, PT_GNU_SFRAME)
+                      or PT_GNU_MBIND_LO <= segment.p_type <= PT_GNU_MBIND_HI):
+        return False
+    size = sectionSize(section, segment)
+    # Sections with bytes in the file must lie inside the file part of the segment
+    if not nobits:
+        if section.sh_offset < segment.p_offset or section.sh_offset - segment.p_offset > segment.p_filesz - 1:
+            return False
+        if section.sh_offset - segment.p_offset + size > segment.p_filesz:
+            return False
+    # Allocated sections must lie inside the memory of the segment
+    if alloc:
+        if section.sh_addr < segment.p_vaddr or section.sh_addr - segment.p_vaddr > segment.p_memsz - 1:
+            return False
+        if section.sh_addr - segment.p_vaddr + size > segment.p_memsz:
+            return False
+    # Empty sections at the very start or end of a PT_DYNAMIC or PT_NOTE segment are not shown in it
+    if segment.p_type in (PT_DYNAMIC, PT_NOTE) and section.sh_size == 0 and segment.p_memsz != 0:
+        if not nobits and not (section.sh_offset > segment.p_offset and section.sh_offset - segment.p_offset < segment.p_filesz):
+            return False
+        if alloc and not (section.sh_addr > segment.p_vaddr and section.sh_addr - segment.p_vaddr < segment.p_memsz):
+            return False
+    return True
+
+class SegmentMapping():
+    # Works out which sections every segment holds, like readelf's "Section to Segment mapping".
+    # Rather than testing every section against every segment, the sections and segments are each sorted by where they
+    # start and swept once together, so a section is only tested against the segments whose range has started and not
+    # yet ended where it starts. Sections with bytes in the file are swept by file offset, .bss like sections by address.
+    def __init__(self, programEntries, sectionEntries, sectionNames) -> None:
+        self.programEntries = programEntries
+        self.sectionNames = sectionNames
+        self.segmentSections = [[] for _ in programEntries]
+        # The null section at index 0 is never part of a segment
+        sections = list(enumerate(sectionEntries))[1:]
+        self.sweep(
+            [(section.sh_offset, index, section) for index, section in sections if section.sh_type != SHT_NOBITS],
+            [(segment.p_offset, segment.p_offset + segment.p_filesz, index, segment) for index, segment in enumerate(programEntries)]
+        )
+        self.sweep(
+            [(section.sh_addr, index, section) for index, section in sections if section.sh_type == SHT_NOBITS],
+            [(segment.p_vaddr, segment.p_vaddr + segment.p_memsz, index, segment) for index, segment in enumerate(programEntries)]
+        )
+        for indexes in self.segmentSections:
+            indexes.sort()
+
+    # Visits the sections in order of where they start. Segments join the active list once their start is reached and
+    # leave it once a section starts past their end, and each section is only tested against the active segments.
+    def sweep(self, sections, segments):
+        sections.sort(key=lambda item: item[0])
+        segments.sort(key=lambda item: item[0])
+        active = []
+        position = 0
+        for start, sectionIndex, section in sections:
+            while position < len(segments) and segments[position][0] <= start:
+                active.append(segments[position])
+                position += 1
+            active = [item for item in active if item[1] >= start]
+            for _, _, segmentIndex, segment in active:
+                if sectionInSegment(section, segment):
+                    self.segmentSections[segmentIndex].append(sectionIndex)
+
+    # Returns the indexes of the sections held by the segment at index
+    def getSections(self, index):
+        return list(self.segmentSections[index])
+
+    recordFields = ('segment', 'sections')
+    textHeading = '\t%-8s %s' %('Segment', 'Sections')
+
+    # Prints which sections every segment holds in a similar format to readelf
+    def getMapping(self):
+        TextRenderer(sys.stdout).render('segmentMapping', self)
+
+    # Yields one record per segment with the names of its sections separated by spaces
+    def iterRecords(self):
+        for index, sectionIndexes in enumerate(self.segmentSections):
+            yield {
+                'segment': index,
+                'sections': ' '.join(self.sectionNames[sectionIndex] for sectionIndex in sectionIndexes),
+            }
+
+    # Returns the text table line for one record
+    # Source: Visually inspecting readelf results
+    def formatText(self, record):
+        return '\t%-8s %s' %('%02d' %(record['segment']), record['sections'])
@@ -0,0 +1,21 @@
+import os
+import json
+import tempfile
+
+# Requests and responses are single lines of JSON. Uploaded files travel base64 encoded inside a request, so lines can be large.
+MESSAGE_LIMIT = 1 << 30
+
+# Where the server listens when no socket path is given: the user's runtime directory, or a per-user name in the temp directory
+def defaultSocketPath():
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return os.path.join(runtime, 'readelf_clone.sock')
+    return os.path.join(tempfile.gettempdir(), 'readelf_clone-%d.sock' %(os.getuid()))
+
+# Returns a message as one line of JSON
+def encodeMessage(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b"\n"
+
+# Returns the message held in one line of JSON
+def decodeMessage(line):
+    return json.loads(line)
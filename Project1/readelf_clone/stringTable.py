@@ -0,0 +1,48 @@
+class StringTable():
+    # Holds a view of one string table section (.strtab, .dynstr, .shstrtab) so it is only located once per Elf.
+    # Names are resolved by scanning from the offset to the next NUL, and every name is remembered after its first lookup.
+    # Source: https://refspecs.linuxbase.org/elf/gabi4+/ch4.strtab.html
+    def __init__(self, elf, section) -> None:
+        self.elf = elf
+        self.start = section.sh_offset
+        self.end = section.sh_offset + section.sh_size
+        self.buffer = elf.view(self.start, section.sh_size)
+        self.names = {}
+
+    # Rebuilds a table holding only the names stored by getSnapshot, without touching the file
+    @classmethod
+    def fromSnapshot(cls, snapshot):
+        stringTable = cls.__new__(cls)
+        stringTable.elf = None
+        stringTable.start = stringTable.end = 0
+        stringTable.buffer = b''
+        stringTable.names = {int(offset): name for offset, name in snapshot.items()}
+        return stringTable
+
+    # Returns every name looked up so far keyed by offset, in a form that can be stored in the parse cache
+    def getSnapshot(self):
+        return dict(self.names)
+
+    # Returns the string starting at offset inside the table, or an empty string for offsets outside of it
+    def getString(self, offset):
+        try:
+            return self.names[offset]
+        except KeyError:
+            pass
+        if offset >= len(self.buffer):
+            output = ''
+        else:
+            output = self.elf.cstring(self.start + offset, self.end)
+        self.names[offset] = output
+        return output
+
+    # Returns the string starting at offset like getString, without remembering it, so a pass over every name of a
+    # huge table does not keep them all.
+    def readString(self, offset):
+        try:
+            return self.names[offset]
+        except KeyError:
+            pass
+        if offset >= len(self.buffer):
+            return ''
+        return self.elf.cstring(self.start + offset, self.end)
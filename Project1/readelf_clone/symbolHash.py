@@ -0,0 +1,109 @@
+from readelf_clone.elfStructs import getStruct
+
+SHT_HASH = 5
+SHT_GNU_HASH = 0x6ffffff6
+SHN_UNDEF = 0
+
+# The System V hash of a symbol name used by .hash
+# Source: https://refspecs.linuxbase.org/elf/gabi4+/ch5.dynamic.html#hash
+def sysvHash(name):
+    h = 0
+    for byte in name:
+        h = (h << 4) + byte
+        g = h & 0xf0000000
+        if g:
+            h ^= g >> 24
+        h &= ~g & 0xffffffff
+    return h
+
+# The GNU (DJB) hash of a symbol name used by .gnu.hash
+# Source: https://flapenguin.me/elf-dt-gnu-hash
+def gnuHash(name):
+    h = 5381
+    for byte in name:
+        h = (h * 33 + byte) & 0xffffffff
+    return h
+
+class SymbolHash():
+    # Answers "which .dynsym entry is called name" through the hash table the linker already built for the dynamic
+    # loader, so a lookup only decodes the symbols sharing the name's bucket instead of the whole table.
+    # .gnu.hash is preferred when present since its bloom filter rejects most missing names without touching a
+    # bucket. Only the header words are read up front, every bucket, chain and bloom word is read when a lookup needs it.
+    # Source:
+    #    https://refspecs.linuxbase.org/elf/gabi4+/ch5.dynamic.html#hash
+    #    https://flapenguin.me/elf-dt-gnu-hash
+    def __init__(self, elf, ei_class, ei_data, section, symbolTable) -> None:
+        self.elf = elf
+        self.symbolTable = symbolTable
+        self.word = getStruct('HashWord', ei_class, ei_data)
+        self.table = elf.view(section.sh_offset, section.sh_size)
+        if section.sh_type == SHT_GNU_HASH:
+            self.lookup = self.lookupGnu
+            self.nbuckets, self.symoffset, bloomSize, self.bloomShift = (self.readWord(index) for index in range(4))
+            self.bloomWord = getStruct('BloomWord', ei_class, ei_data)
+            self.bloomBits = self.bloomWord.size * 8
+            self.bloomSize = bloomSize
+            self.bloomOffset = 4 * self.word.size
+            self.bucketOffset = self.bloomOffset + bloomSize * self.bloomWord.size
+            self.chainOffset = self.bucketOffset + self.nbuckets * self.word.size
+        else:
+            self.lookup = self.lookupSysv
+            self.nbuckets, self.nchain = self.readWord(0), self.readWord(1)
+            self.bucketOffset = 2 * self.word.size
+            self.chainOffset = self.bucketOffset + self.nbuckets * self.word.size
+
+    # Returns the 32 bit word at index words into the table
+    def readWord(self, index):
+        return self.word.unpack_from(self.table, index * self.word.size)[0]
+
+    # Returns the defined .dynsym entry called name, or None when the object does not export it
+    def lookup_dynamic(self, name):
+        if self.nbuckets == 0:
+            return None
+        return self.lookup(name, name.encode())
+
+    # Returns the entry at index in the symbol table when it is defined and called name
+    def matchSymbol(self, index, name):
+        if index >= len(self.symbolTable.entries):
+            return None
+        entry = self.symbolTable.entries[index]
+        if entry.st_shndx != SHN_UNDEF and entry.st_converted_name == name:
+            return entry
+        return None
+
+    # Walks the bucket of the name's hash and its chain until a matching entry or the end of the chain (index 0)
+    def lookupSysv(self, name, encoded):
+        index = self.readWord(2 + sysvHash(encoded) % self.nbuckets)
+        visited = 0
+        while index != 0 and index < self.nchain and visited < self.nchain:
+            entry = self.matchSymbol(index, name)
+            if entry is not None:
+                return entry
+            index = self.readWord(2 + self.nbuckets + index)
+            visited += 1
+        return None
+
+    # Tests the two bloom filter bits of the hash, then walks the bucket's run of chain hashes. The low bit of a
+    # chain hash marks the last symbol of the bucket, and only entries whose hash matches are decoded.
+    def lookupGnu(self, name, encoded):
+        h = gnuHash(encoded)
+        if self.bloomSize:
+            bloom = self.bloomWord.unpack_from(self.table, self.bloomOffset + (h // self.bloomBits) % self.bloomSize * self.bloomWord.size)[0]
+            mask = (1 << h % self.bloomBits) | (1 << (h >> self.bloomShift) % self.bloomBits)
+            if bloom & mask != mask:
+                return None
+        index = self.word.unpack_from(self.table, self.bucketOffset + h % self.nbuckets * self.word.size)[0]
+        if index < self.symoffset:
+            return None
+        while True:
+            chainOffset = self.chainOffset + (index - self.symoffset) * self.word.size
+            if chainOffset + self.word.size > len(self.table):
+                return None
+            chainHash = self.word.unpack_from(self.table, chainOffset)[0]
+            if chainHash | 1 == h | 1:
+                entry = self.matchSymbol(index, name)
+                if entry is not None:
+                    return entry
+            if chainHash & 1:
+                return None
+            index += 1
@@ -0,0 +1,123 @@
+import heapq
+from bisect import bisect_right
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Symbol types whose st_value is not an address in the image: SECTION, FILE, COMMON and TLS
+NON_ADDRESS_TYPES = {3, 4, 5, 6}
+SHN_UNDEF = 0
+
+class SymbolIndex():
+    # Builds the address and name indexes over every given symbol table (typically .symtab then .dynsym) once.
+    # Symbols present in more than one table with the same name, value and size are only indexed once.
+    # The address index flattens the (possibly nested) symbol ranges into sorted, non-overlapping runs that each
+    # belong to the innermost symbol covering them, so a lookup is a single bisect.
+    # Source: https://refspecs.linuxbase.org/elf/gabi4+/ch4.symtab.html
+    def __init__(self, symbolTables) -> None:
+        self.names = {}
+        # Symbols without a size only match their exact address
+        self.exact = {}
+        ranges = []
+        seen = set()
+        for table in symbolTables:
+            if table is None:
+                continue
+            for entry in table.entries:
+                identity = (entry.st_converted_name, entry.st_value, entry.st_size)
+                if identity in seen:
+                    continue
+                seen.add(identity)
+                self.names.setdefault(entry.st_converted_name, []).append(entry)
+                if entry.st_shndx == SHN_UNDEF or entry.st_type in NON_ADDRESS_TYPES:
+                    continue
+                if entry.st_size == 0:
+                    self.exact.setdefault(entry.st_value, entry)
+                else:
+                    ranges.append((entry.st_value, entry.st_value + entry.st_size, entry))
+        self.starts, self.owners = self.flattenRanges(ranges)
+        self.startArray = None
+        if numpy is not None:
+            self.createArrays()
+
+    # Builds the arrays symbolize_many works on: the run starts, the sorted exact addresses, and one object array holding
+    # the owner of every run, then the symbol at every exact address, then None, which the lookups index into.
+    def createArrays(self):
+        self.startArray = numpy.array(self.starts, dtype=numpy.uint64)
+        exactAddresses = sorted(self.exact)
+        self.exactArray = numpy.array(exactAddresses, dtype=numpy.uint64)
+        self.symbolArray = numpy.empty(len(self.owners) + len(exactAddresses) + 1, dtype=object)
+        for index, entry in enumerate(self.owners + [self.exact[addr] for addr in exactAddresses]):
+            self.symbolArray[index] = entry
+        # The index into symbolArray of the owner of every run, -1 for the gaps between symbols
+        self.ownerArray = numpy.array([-1 if owner is None else index for index, owner in enumerate(self.owners)], dtype=numpy.int64)
+
+    # Sweeps the sorted range boundaries once, keeping the covering symbols on a heap ordered by latest start then smallest size.
+    # Returns the start of each run and the symbol owning it (None for gaps between symbols).
+    def flattenRanges(self, ranges):
+        ranges.sort(key=lambda item: (item[0], item[1]))
+        boundaries = sorted({start for start, _, _ in ranges} | {end for _, end, _ in ranges})
+        starts = []
+        owners = []
+        active = []
+        position = 0
+        for boundary in boundaries:
+            while position < len(ranges) and ranges[position][0] == boundary:
+                start, end, entry = ranges[position]
+                heapq.heappush(active, (-start, end - start, position, end, entry))
+                position += 1
+            while active and active[0][3] <= boundary:
+                heapq.heappop(active)
+            owner = active[0][4] if active else None
+            if owners and owners[-1] is owner:
+                continue
+            starts.append(boundary)
+            owners.append(owner)
+        return starts, owners
+
+    # Returns the symbol whose range contains addr, or None when no symbol does
+    def symbolize(self, addr):
+        position = bisect_right(self.starts, addr) - 1
+        owner = self.owners[position] if position >= 0 else None
+        if owner is None:
+            return self.exact.get(addr)
+        return owner
+
+    # Returns the containing symbol (or None) for every address, in the order given.
+    # With NumPy the run of every address is found with one searchsorted and its owner gathered with one index, the
+    # addresses outside every run are matched against the symbols without a size with a second searchsorted, and the
+    # symbols are picked from one object array, so no Python code runs per address.
+    # Without NumPy a single merge over the sorted addresses is used.
+    def symbolize_many(self, addrs):
+        addrs = list(addrs)
+        if self.startArray is not None:
+            addrArray = numpy.array(addrs, dtype=numpy.uint64)
+            missing = len(self.symbolArray) - 1
+            if len(self.startArray):
+                positions = numpy.searchsorted(self.startArray, addrArray, side='right') - 1
+                owned = numpy.where(positions >= 0, self.ownerArray[numpy.maximum(positions, 0)], -1)
+            else:
+                owned = numpy.full(len(addrs), -1, dtype=numpy.int64)
+            if len(self.exactArray):
+                exactPositions = numpy.searchsorted(self.exactArray, addrArray)
+                clipped = numpy.minimum(exactPositions, len(self.exactArray) - 1)
+                exact = numpy.where(self.exactArray[clipped] == addrArray, len(self.ownerArray) + clipped, missing)
+            else:
+                exact = numpy.full(len(addrs), missing, dtype=numpy.int64)
+            return self.symbolArray[numpy.where(owned >= 0, owned, exact)].tolist()
+        if not self.starts:
+            return [self.exact.get(addr) for addr in addrs]
+        results = [None] * len(addrs)
+        position = -1
+        for index in sorted(range(len(addrs)), key=addrs.__getitem__):
+            addr = addrs[index]
+            while position + 1 < len(self.starts) and self.starts[position + 1] <= addr:
+                position += 1
+            owner = self.owners[position] if position >= 0 else None
+            results[index] = owner if owner is not None else self.exact.get(addr)
+        return results
+
+    # Returns every indexed symbol with the given name, empty when there is none
+    def by_name(self, name):
+        return list(self.names.get(name, ()))
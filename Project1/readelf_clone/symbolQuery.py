@@ -0,0 +1,195 @@
+import re
+import heapq
+from fnmatch import translate
+from readelf_clone.lookupDictionary.lookupDictionary import stDictionary
+from readelf_clone.symbolTable import FIELD_ORDER, SYMBOL_CHUNK_SIZE
+
+# Sort orders: the key of an entry and whether the largest come first
+SORT_KEYS = {
+    'size': (lambda entry: entry.st_size, True),
+    'value': (lambda entry: entry.st_value, False),
+    'name': (lambda entry: entry.st_converted_name, False),
+}
+
+# Returns the numbers of the names (or numbers) given for one of the stDictionary fields, or None when none are given.
+# Raises ValueError for a name that is not in the dictionary.
+def parseValues(attributeKey, names):
+    if not names:
+        return None
+    numbers = {name: value for value, name in stDictionary[attributeKey].items()}
+    values = set()
+    for name in names:
+        if name.upper() in numbers:
+            values.add(numbers[name.upper()])
+        else:
+            try:
+                values.add(int(name, 0))
+            except ValueError:
+                raise ValueError('Unknown %s %s, expected one of %s' %(attributeKey, name, ', '.join(sorted(set(numbers)))))
+    return values
+
+class SymbolFilter():
+    # The conditions a symbol must meet to be listed. Every condition left as None accepts every symbol.
+    #    names          globs matched against the whole name, any of which may match
+    #    regex          regular expression searched for in the name
+    #    types, binds, visibilities, sections   sets of accepted st_type, st_bind, st_vis and st_shndx numbers
+    #    minSize, maxSize, minValue, maxValue   inclusive bounds on st_size and st_value
+    def __init__(self, names=None, regex=None, types=None, binds=None, visibilities=None, sections=None,
+                 minSize=None, maxSize=None, minValue=None, maxValue=None) -> None:
+        self.namePattern = re.compile('|'.join(translate(name) for name in names)) if names else None
+        self.regex = re.compile(regex) if regex else None
+        self.types = types
+        self.binds = binds
+        self.visibilities = visibilities
+        self.sections = sections
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.minValue = minValue
+        self.maxValue = maxValue
+
+    # Returns a function of the raw field tuple of a symbol record (laid out for ei_class) that checks every condition
+    # except the name. The positions of the fields and the conditions are bound once, so checking a record is a few
+    # comparisons on ints.
+    def createPredicate(self, ei_class):
+        fields = FIELD_ORDER[ei_class]
+        info, other, shndx, value, size = (fields.index(name) for name in ('st_info', 'st_other', 'st_shndx', 'st_value', 'st_size'))
+        types, binds, visibilities, sections = self.types, self.binds, self.visibilities, self.sections
+        minSize, maxSize, minValue, maxValue = self.minSize, self.maxSize, self.minValue, self.maxValue
+
+        def matches(values):
+            if types is not None and values[info] & 15 not in types:
+                return False
+            if binds is not None and values[info] >> 4 not in binds:
+                return False
+            if visibilities is not None and values[other] & 3 not in visibilities:
+                return False
+            if sections is not None and values[shndx] not in sections:
+                return False
+            if minSize is not None and values[size] < minSize:
+                return False
+            if maxSize is not None and values[size] > maxSize:
+                return False
+            if minValue is not None and values[value] < minValue:
+                return False
+            if maxValue is not None and values[value] > maxValue:
+                return False
+            return True
+        return matches
+
+    # Returns a function of a resolved name checking the globs and the regular expression, or None when there are neither
+    def createNameMatcher(self):
+        namePattern, regex = self.namePattern, self.regex
+        if namePattern is None and regex is None:
+            return None
+
+        def matchesName(name):
+            if namePattern is not None and namePattern.match(name) is None:
+                return False
+            if regex is not None and regex.search(name) is None:
+                return False
+            return True
+        return matchesName
+
+class SymbolQuery():
+    # Lists the symbols of a symbol table accepted by a SymbolFilter, optionally ordered by size, value or name.
+    # The filter runs on the raw records before names are resolved or entries are built. When only the top entries
+    # are asked for, heapq keeps just that many while streaming through the matches instead of sorting all of them.
+    # Renders the same columns as the symbol table, keeping the number each symbol has in the table.
+    def __init__(self, symbolTable, symbolFilter, sortKey=None, top=None, chunkSize=SYMBOL_CHUNK_SIZE) -> None:
+        self.symbolTable = symbolTable
+        self.symbolFilter = symbolFilter
+        self.sortKey = sortKey if sortKey is not None or top is None else 'size'
+        self.top = top
+        self.chunkSize = chunkSize
+        self.recordFields = symbolTable.recordFields
+        self.textHeading = symbolTable.textHeading
+
+    # Yields (number, entry) for every matching symbol in table order
+    def iterMatches(self):
+        return self.symbolTable.iter_matching(
+            self.symbolFilter.createPredicate(self.symbolTable.ei_class),
+            self.symbolFilter.createNameMatcher(),
+            self.chunkSize
+        )
+
+    # Returns the matching (number, entry) pairs in the order asked for, ties kept in table order
+    def getMatches(self):
+        matches = self.iterMatches()
+        if self.sortKey is None:
+            return matches
+        key, largestFirst = SORT_KEYS[self.sortKey]
+        if self.top is not None:
+            select = heapq.nlargest if largestFirst else heapq.nsmallest
+            return select(self.top, matches, key=lambda item: key(item[1]))
+        return sorted(matches, key=lambda item: key(item[1]), reverse=largestFirst)
+
+    # Matches the valueKey with the corresponding key in the dictionary of the symbol table
+    def safeget(self, attributeKey, valueKey):
+        return self.symbolTable.safeget(attributeKey, valueKey)
+
+    # Yields one record per matching symbol
+    def iterRecords(self):
+        for number, entry in self.getMatches():
+            yield self.symbolTable.createRecord(number, entry)
+
+    # Returns the text table line for one record
+    def formatText(self, record):
+        return self.symbolTable.formatText(record)
+
+# Adds the symbol filter, sort and top-N options to an argument parser, shared by main.py and client.py
+def addQueryArguments(parser):
+    parser.add_argument("--name", help="Only list symbols whose name matches this glob (repeatable)", action='append', default=[], required=False)
+    parser.add_argument("--regex", help="Only list symbols whose name contains a match for this regular expression", default=None, required=False)
+    parser.add_argument("--type", help="Only list symbols of this type, such as FUNC or OBJECT (repeatable)", action='append', default=[], required=False)
+    parser.add_argument("--bind", help="Only list symbols with this binding, such as GLOBAL or WEAK (repeatable)", action='append', default=[], required=False)
+    parser.add_argument("--visibility", help="Only list symbols with this visibility, such as DEFAULT or HIDDEN (repeatable)", action='append', default=[], required=False)
+    parser.add_argument("--ndx", help="Only list symbols in the section with this index (repeatable)", type=lambda text: int(text, 0), action='append', default=[], required=False)
+    parser.add_argument("--min-size", help="Only list symbols of at least this size", type=lambda text: int(text, 0), default=None, required=False)
+    parser.add_argument("--max-size", help="Only list symbols of at most this size", type=lambda text: int(text, 0), default=None, required=False)
+    parser.add_argument("--min-value", help="Only list symbols with a value (address) of at least this", type=lambda text: int(text, 0), default=None, required=False)
+    parser.add_argument("--max-value", help="Only list symbols with a value (address) of at most this", type=lambda text: int(text, 0), default=None, required=False)
+    parser.add_argument("--sort", help="List symbols by decreasing size, or increasing value or name", choices=sorted(SORT_KEYS), default=None, required=False)
+    parser.add_argument("--top", help="Only list the first N symbols in --sort order (by size when --sort is not given)", type=int, default=None, required=False)
+
+# Returns the query given by the options of addQueryArguments as a dict of plain values, the form it is sent to the
+# server in, or None when no option was given
+def getQueryOptions(args):
+    query = {
+        'names': args.name,
+        'regex': args.regex,
+        'types': args.type,
+        'binds': args.bind,
+        'visibilities': args.visibility,
+        'sections': args.ndx,
+        'minSize': args.min_size,
+        'maxSize': args.max_size,
+        'minValue': args.min_value,
+        'maxValue': args.max_value,
+        'sort': args.sort,
+        'top': args.top,
+    }
+    if not any(value is not None and value != [] for value in query.values()):
+        return None
+    return query
+
+# Returns the renderTables transform listing both symbol tables through a SymbolQuery built from a query of
+# getQueryOptions, or None for no query. Raises ValueError (or re.error) for unknown names and sort orders or a bad regex.
+def createTransform(query):
+    if query is None:
+        return None
+    symbolFilter = SymbolFilter(
+        query.get('names'),
+        query.get('regex'),
+        parseValues('stType', query.get('types')),
+        parseValues('stBind', query.get('binds')),
+        parseValues('stVisibility', query.get('visibilities')),
+        set(query['sections']) if query.get('sections') else None,
+        query.get('minSize'),
+        query.get('maxSize'),
+        query.get('minValue'),
+        query.get('maxValue')
+    )
+    sortKey, top = query.get('sort'), query.get('top')
+    if sortKey is not None and sortKey not in SORT_KEYS:
+        raise ValueError('Unknown sort order %s, expected one of %s' %(sortKey, ', '.join(sorted(SORT_KEYS))))
+    return lambda table, component: SymbolQuery(component, symbolFilter, sortKey, top) if table in ('symbols', 'dynamicSymbols') else component
@@ -1,23 +1,33 @@
-import struct
 from readelf_clone.sectionHeader import *
 from readelf_clone.lookupDictionary.lookupDictionary import stDictionary
-BYTE = 1
-HALFWORD = 2
-WORD = 4
-DOUBLEWORD = 8
+from readelf_clone.elfStructs import getStruct
+from readelf_clone.renderers import TextRenderer
+import sys
+
+# Number of records decoded at a time by iter_symbols
+SYMBOL_CHUNK_SIZE = 4096
+# The order of the fields of a symbol record, which differs between 32-bit and 64-bit files
+FIELD_ORDER = {
+    1: ('st_name', 'st_value', 'st_size', 'st_info', 'st_other', 'st_shndx'),
+    2: ('st_name', 'st_info', 'st_other', 'st_shndx', 'st_value', 'st_size'),
+}
 
 class SymbolTable():
     # Initializes the program header object with attributes that are usable to create entries
-    def __init__(self, elf, ei_class, sectionEntries, index_symbol_table, index_symbol_string_table, e_shstrndx, e_shentsize) -> None:
+    def __init__(self, elf, ei_class, ei_data, sectionEntries, index_symbol_table, stringTable, sectionStringTable) -> None:
         self.elf = elf
         self.ei_class = ei_class
+        self.ei_data = ei_data
         self.sectionEntries = sectionEntries
         # The index of the symbol table in the list of sections
         self.index_symbol_table = index_symbol_table
-        # The index of the string table in the list of section that corresponds to the symbol table
-        self.index_symbol_string_table = index_symbol_string_table
-        self.e_shentsize = e_shentsize
-        self.e_shstrndx = e_shstrndx
+        # The string table that corresponds to the symbol table, shared by every entry
+        self.stringTable = stringTable
+        # The section header string table used to name SECTION symbols
+        self.sectionStringTable = sectionStringTable
+        self.stats = elf.stats
+        if self.stats is not None:
+            self.phaseName = 'SymbolTable.createEntries(%s)' %(sectionStringTable.getString(sectionEntries[index_symbol_table].sh_name))
         self.entries = self.createEntries()
 
     # Matches the valueKey (typically an attibute of the object) with the corresponding key in the corresponding dictionary
@@ -28,94 +38,185 @@ class SymbolTable():
             return "Unknown"
         return message
 
-    # Creates and returns a list of entries that can be iterated over
+    # Creates and returns the entries of the table. Nothing is decoded until an entry is indexed or iterated over.
     def createEntries(self):
-        entryList = []
-        currentOffset = 0
-        while currentOffset < self.sectionEntries[self.index_symbol_table].sh_size:
-            entryList.append(self.SymbolEntry(self.elf, self.ei_class, self.sectionEntries, self.index_symbol_table, self.index_symbol_string_table, currentOffset, self.e_shstrndx, self.e_shentsize))
-            if self.ei_class == 1:
-                currentOffset += 16
+        self.layout = getStruct('Symbol', self.ei_class, self.ei_data)
+        section = self.sectionEntries[self.index_symbol_table]
+        count = section.sh_size // self.layout.size
+        self.records = self.elf.view(section.sh_offset, count * self.layout.size)
+        return self.SymbolEntryList(self, count)
+
+    # Decodes the entry at index from its record
+    def decodeEntry(self, index):
+        if self.stats is None:
+            return self.createEntry(self.getValues(index))
+        with self.stats.phase(self.phaseName):
+            entry = self.createEntry(self.getValues(index))
+        self.stats.countRecords(self.phaseName, 1)
+        return entry
+
+    # Yields every entry of the table in order while holding no more than chunk_size decoded entries at a time.
+    # The records are read as zero-copy slices of chunk_size records, each decoded in bulk by one iter_unpack, and names
+    # are resolved without being kept by the string table unless rememberNames is set, so memory stays bounded
+    # whatever the size of the table.
+    def iter_symbols(self, chunk_size=SYMBOL_CHUNK_SIZE, rememberNames=False):
+        createEntry = self.createEntry
+        for start in range(0, len(self.entries), chunk_size):
+            records = self.getChunk(start, min(start + chunk_size, len(self.entries)))
+            if self.stats is None:
+                block = [createEntry(values, rememberNames) for values in records]
             else:
-                currentOffset += 24
-        return entryList
+                # When profiling, the timers are read once per chunk rather than once per record
+                with self.stats.phase(self.phaseName):
+                    block = [createEntry(values, rememberNames) for values in records]
+                self.stats.countRecords(self.phaseName, len(block))
+            yield from block
+
+    # Yields (number, entry) for the records accepted by predicate, a function of the raw field tuple, and then by
+    # matchesName, a function of the resolved name. Rejected records are never named or turned into entries, so filtering
+    # on the type, binding, section or size of a symbol costs one tuple check per record.
+    def iter_matching(self, predicate, matchesName=None, chunk_size=SYMBOL_CHUNK_SIZE):
+        fields = FIELD_ORDER[self.ei_class]
+        name, info, shndx = fields.index('st_name'), fields.index('st_info'), fields.index('st_shndx')
+        for start in range(0, len(self.entries), chunk_size):
+            for number, values in enumerate(self.getChunk(start, min(start + chunk_size, len(self.entries))), start):
+                if not predicate(values):
+                    continue
+                convertedName = self.getEntryName(values[name], values[info], values[shndx], False)
+                if matchesName is not None and not matchesName(convertedName):
+                    continue
+                entry = self.SymbolEntry(values, self.ei_class)
+                entry.st_converted_name = convertedName
+                yield number, entry
+
+    # Returns the raw field tuples of the records from start up to end, decoded in bulk from one zero-copy slice
+    def getChunk(self, start, end):
+        return self.layout.iter_unpack(self.records[start * self.layout.size:end * self.layout.size])
+
+    # Returns the raw field tuple of the record at index
+    def getValues(self, index):
+        return self.layout.unpack_from(self.records, index * self.layout.size)
+
+    # Builds the entry for one record and names it from the string tables held by the table
+    def createEntry(self, values, rememberNames=True):
+        entry = self.SymbolEntry(values, self.ei_class)
+        entry.st_converted_name = self.getEntryName(entry.st_name, entry.st_info, entry.st_shndx, rememberNames)
+        return entry
+
+    # Returns the name of a symbol: SECTION symbols without a name of their own are named after their section
+    def getEntryName(self, st_name, st_info, st_shndx, rememberNames=True):
+        if st_name == 0 and st_info & 15 == 3:
+            return self.getSHStringTable(self.sectionEntries[st_shndx].sh_name)
+        return self.getSTStringTable(st_name, rememberNames)
+
+    # Returns the corresponding string for the name offset in the string table
+    def getSTStringTable(self, nameOffset, rememberNames=True):
+        if rememberNames:
+            output = self.stringTable.getString(nameOffset)
+        else:
+            output = self.stringTable.readString(nameOffset)
+        if output == '':
+            return 'NULL'
+        return output
+    
+    # Returns the corresponding string for the name offset in the section header string table
+    def getSHStringTable(self, sh_name):
+        output = self.sectionStringTable.getString(sh_name)
+        if output == '':
+            return 'NULL'
+        return output
     
+    recordFields = ('num', 'st_value', 'st_size', 'st_type', 'st_bind', 'st_vis', 'st_shndx', 'name')
+    textHeading = '\t%-5s %-8s %-6s %-8s %-8s %-10s %-6s %-8s' %('Num:', 'Value', 'Size', 'Type', 'Bind', 'Vis', 'Ndx', 'Name')
+
     # Iterates over the list of entries and returns the results from their respective fields.
-    # Source: Visually inspecting readelf results
+    # The table is streamed through iter_symbols, so printing it does not hold every entry or name.
     def getSymbolTable(self):
-        number = 0
-        print('\t%-5s %-8s %-6s %-8s %-8s %-10s %-6s %-8s' %('Num:', 'Value', 'Size', 'Type', 'Bind', 'Vis', 'Ndx', 'Name'))
-        for entry in self.entries:
-            print('\t%-5s %-8s %-6s %-8s %-8s %-10s %-6s %-8s' 
-                    %(
-                        number,
-                        "{:06x}".format(entry.st_value),
-                        entry.st_size,
-                        self.safeget('stType', entry.st_type),
-                        self.safeget('stBind', entry.st_bind),
-                        self.safeget('stVisibility', entry.st_vis),
-                        entry.st_shndx,
-                        entry.st_converted_name
-                    )
-            
-            )
-            number = number + 1
+        TextRenderer(sys.stdout).render('symbols', self)
+
+    # Yields one record per symbol as the table is decoded, with the type, binding and visibility converted to their names
+    def iterRecords(self):
+        for number, entry in enumerate(self.iter_symbols()):
+            yield self.createRecord(number, entry)
+
+    # Returns the record of the entry numbered number
+    def createRecord(self, number, entry):
+        return {
+            'num': number,
+            'st_value': entry.st_value,
+            'st_size': entry.st_size,
+            'st_type': self.safeget('stType', entry.st_type),
+            'st_bind': self.safeget('stBind', entry.st_bind),
+            'st_vis': self.safeget('stVisibility', entry.st_vis),
+            'st_shndx': entry.st_shndx,
+            'name': entry.st_converted_name,
+        }
+
+    # Returns the text table line for one record
+    # Source: Visually inspecting readelf results
+    def formatText(self, record):
+        return ('\t%-5s %-8s %-6s %-8s %-8s %-10s %-6s %-8s' 
+                %(
+                    record['num'],
+                    "{:06x}".format(record['st_value']),
+                    record['st_size'],
+                    record['st_type'],
+                    record['st_bind'],
+                    record['st_vis'],
+                    record['st_shndx'],
+                    record['name']
+                ))
+
+    class SymbolEntryList():
+        # A read-only sequence over the records of a symbol table that decodes each entry on indexing
+        def __init__(self, table, count) -> None:
+            self.table = table
+            self.count = count
+
+        def __len__(self):
+            return self.count
+
+        def __getitem__(self, index):
+            if isinstance(index, slice):
+                return [self.table.decodeEntry(position) for position in range(*index.indices(self.count))]
+            if index < 0:
+                index += self.count
+            if index < 0 or index >= self.count:
+                raise IndexError('symbol index out of range')
+            return self.table.decodeEntry(index)
+
+        # Decodes the records in one pass over the table instead of one unpack_from per index. Names are not kept by the
+        # string table, so iterating over a huge table holds no more than one chunk of entries and names at a time.
+        def __iter__(self):
+            return self.table.iter_symbols(rememberNames=False)
 
     class SymbolEntry():
-        # Initializes a section header entry and unpacks the bytes sequentially with the corresponding size from documention
+        # Only the decoded fields and the resolved name are stored per entry. Everything shared by the table
+        # (class, section list, string tables) stays on the SymbolTable.
+        __slots__ = ('st_name', 'st_value', 'st_size', 'st_info', 'st_other', 'st_shndx', 'st_converted_name')
+
+        # Initializes a symbol entry from the fields unpacked in the order given by the documention
         # Source: 
         #    https://refspecs.linuxbase.org/elf/gabi4+/
         #    https://wiki.osdev.org/ELF_Tutorial
         #    https://en.wikipedia.org/wiki/Executable_and_Linkable_Format
         #    https://man7.org/linux/man-pages/man5/elf.5.html
-        def __init__(self, elf, ei_class, sectionEntries, index_table, index_string_table, currentOffset, e_shstrndx, e_shentsize) -> None:
-            self.elf = elf
-            self.ei_class = ei_class
-            self.sectionEntries = sectionEntries
-            self.index_tale = index_table
-            self.index_string_table = index_string_table
-            self.e_shstrndx = e_shstrndx
-            self.e_shentsize = e_shentsize
-            elf.seek(self.sectionEntries[index_table].sh_offset + currentOffset)
-            if self.ei_class == 1:
-                self.st_name = struct.unpack('I', self.elf.read(WORD))[0]
-                self.st_value = struct.unpack('I', self.elf.read(WORD))[0]
-                self.st_size = struct.unpack('I', self.elf.read(WORD))[0]
-                self.st_info = struct.unpack('B', self.elf.read(BYTE))[0]
-                self.st_other = struct.unpack('B', self. elf.read(BYTE))[0]
-                self.st_shndx = struct.unpack('H', self.elf.read(HALFWORD))[0]
-            else:
-                self.st_name = struct.unpack('I', self.elf.read(WORD))[0]
-                self.st_info = struct.unpack('B', self.elf.read(BYTE))[0]
-                self.st_other = struct.unpack('B', self.elf.read(BYTE))[0]
-                self.st_shndx = struct.unpack('H', self. elf.read(HALFWORD))[0]
-                self.st_value = struct.unpack('Q', self.elf.read(DOUBLEWORD))[0]
-                self.st_size = struct.unpack('Q', self.elf.read(DOUBLEWORD))[0]
-
-            self.st_type = self.st_info & 15
-            self.st_bind = self.st_info >> 4
-            self.st_vis = self.st_other & 3
-            if self.st_name == 0 and self.st_type == 3:
-                self.st_converted_name = self.getSHStringTable(self.sectionEntries[self.st_shndx].sh_name)
+        def __init__(self, values, ei_class) -> None:
+            if ei_class == 1:
+                self.st_name, self.st_value, self.st_size, self.st_info, self.st_other, self.st_shndx = values
             else:
-                self.st_converted_name = self.getSTStringTable(self.st_name, self.index_string_table)
-
-         # Returns the corresponding string for the name offset in the string table
-        def getSTStringTable(self, nameOffset, index_string_table):
-            stringSectionObject = self.sectionEntries[index_string_table]
-            self.elf.seek(stringSectionObject.sh_offset + nameOffset)
-            data = self.elf.read(stringSectionObject.sh_size)
-            output = data.split(b"\x00")[0].decode()
-            if output == '':
-                return 'NULL'
-            return output
-        
-        # Returns the corresponding string for the name offset in the section header string table
-        def getSHStringTable(self, sh_name):
-            stringSectionObject = self.sectionEntries[self.e_shstrndx]
-            self.elf.seek(stringSectionObject.sh_offset + sh_name)
-            data = self.elf.read(self.e_shentsize)
-            output = data.split(b"\x00")[0].decode()
-            if output == '':
-                return 'NULL'
-            return output
+                self.st_name, self.st_info, self.st_other, self.st_shndx, self.st_value, self.st_size = values
+            self.st_converted_name = None
+
+        # The type, binding and visibility are derived from st_info and st_other when asked for
+        @property
+        def st_type(self):
+            return self.st_info & 15
+
+        @property
+        def st_bind(self):
+            return self.st_info >> 4
+
+        @property
+        def st_vis(self):
+            return self.st_other & 3
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import signal
+import tempfile
+import unittest
+import subprocess
+
+# Runs from the Project1 directory: python -m unittest discover tests (or python -m pytest tests)
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE = os.path.join(PROJECT, 'examples', 'elf-gcc-x32')
+
+# Returns the standard output of one of the scripts of the project run with arguments, failing on a non-zero exit
+def runScript(script, *arguments):
+    result = subprocess.run([sys.executable, os.path.join(PROJECT, script)] + list(arguments), cwd=PROJECT,
+                            capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise AssertionError('%s %s failed: %s' %(script, ' '.join(arguments), result.stderr))
+    return result.stdout
+
+class ClientServerTest(unittest.TestCase):
+    # Starts one server on a Unix socket in a private directory for every test of the class
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.socketPath = os.path.join(cls.directory.name, 'server.sock')
+        cls.server = subprocess.Popen([sys.executable, os.path.join(PROJECT, 'main.py'), '--serve', '--socket', cls.socketPath, '-j', '1'],
+                                      cwd=PROJECT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 30
+        while not os.path.exists(cls.socketPath):
+            if cls.server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError('The server did not start')
+            time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.send_signal(signal.SIGINT)
+        try:
+            cls.server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            cls.server.kill()
+        cls.directory.cleanup()
+
+    def testFilteredSymbols(self):
+        options = ['-s', '--type', 'FUNC', '--bind', 'GLOBAL', '--sort', 'size', '--top', '5']
+        expected = runScript('main.py', *options, EXAMPLE)
+        self.assertEqual(runScript('client.py', '--socket', self.socketPath, *options, EXAMPLE), expected)
+        # The heading and exactly the five symbols asked for
+        self.assertEqual(len(expected.strip().splitlines()), 7)
+        self.assertNotEqual(runScript('client.py', '--socket', self.socketPath, '-s', EXAMPLE), expected)
+
+    def testFilteredUpload(self):
+        options = ['-s', '--name', 'str*', '--output-format', 'jsonl']
+        self.assertEqual(runScript('client.py', '--socket', self.socketPath, '--upload', *options, EXAMPLE), runScript('main.py', *options, EXAMPLE))
+
+if __name__ == '__main__':
+    unittest.main()